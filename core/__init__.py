@@ -4,6 +4,6 @@ DG-LAB 设备控制核心模块
 """
 
 from .dglab_device import DGLabDevice
-from .models import ChannelA, ChannelB, WaveSet
+from .models import Channel, ChannelA, ChannelB, WaveSet
 
-__all__ = ['DGLabDevice', 'ChannelA', 'ChannelB', 'WaveSet'] 
\ No newline at end of file
+__all__ = ['DGLabDevice', 'Channel', 'ChannelA', 'ChannelB', 'WaveSet']
\ No newline at end of file
@@ -5,9 +5,12 @@ DG-LAB V2 蓝牙通信模块
 
 import asyncio
 import logging
+import struct
+from operator import itemgetter
 from typing import List, Tuple, Dict, Optional, Any
 from bleak import BleakScanner, BleakClient
 from bleak.backends.device import BLEDevice
+from bleak.backends.scanner import AdvertisementData
 
 # 设置日志
 logger = logging.getLogger(__name__)
@@ -30,35 +33,117 @@ class DeviceUUID:
     CHAR_ESTIM_A = "955a1506-0fe2-f5aa-a094-84b8d4f3e8ad"
 
 
-async def scan_devices(timeout: float = 5.0) -> List[Tuple[str, int, str]]:
+# 0-100强度到设备原生值的查找表：换算到0-1023范围再乘2（设备按两倍值读写），
+# 输入只有101种，预先算好省去每次写入时的乘除运算
+_STRENGTH_LUT = tuple((i * 1023 // 100) * 2 for i in range(101))
+
+# 通道到特征UUID的映射，替代每次写入时的字符串分支
+_CHANNEL_CHAR_MAP = {
+    'A': DeviceUUID.CHAR_ESTIM_A,
+    'B': DeviceUUID.CHAR_ESTIM_B,
+}
+
+# 预编译的小端32位打包器，取前3字节即为设备要求的24位载荷；
+# struct.Struct缓存了格式解析，pack是C实现，比int.to_bytes更快
+_PACK_LE32 = struct.Struct("<I").pack
+
+# 复用的强度写入缓冲区，避免每次写入分配新的bytes+bytearray；
+# 写入在单个事件循环内串行执行，且bleak发包时会复制缓冲区内容
+_strength_buf = bytearray(3)
+
+
+async def scan_devices(timeout: float = 5.0, min_rssi: int = -90) -> List[Tuple[str, int, str]]:
     """
     扫描周围的DG-LAB V2设备
-    
+
+    使用检测回调并按服务UUID过滤，让系统蓝牙栈在广播到达Python之前
+    丢弃无关设备，避免在嘈杂的RF环境中构建大量无用的广播数据
+
     Args:
         timeout: 扫描超时时间（秒）
-        
+        min_rssi: 最低信号强度阈值(dBm)，低于该值的广播被忽略
+
     Returns:
-        List[Tuple[str, int, str]]: 设备列表，每项为(地址, RSSI强度, 设备名称)
+        List[Tuple[str, int, str]]: 设备列表，每项为(地址, RSSI强度, 设备名称)，
+            按信号强度从强到弱排序
     """
     logger.info(f"开始扫描DG-LAB V2设备，超时: {timeout}秒")
-    
-    devices = await BleakScanner.discover(return_adv=True)
-    
-    # 过滤出DG-LAB V2设备
-    dglab_devices = []
-    for device, adv_data in devices.values():
-        if device.name and DeviceUUID.DEVICE_NAME_PREFIX in device.name:
-            logger.info(f"找到设备: {device.name} ({device.address}), RSSI: {adv_data.rssi}")
-            dglab_devices.append((device.address, adv_data.rssi, device.name))
-    
+
+    dglab_devices: List[Tuple[str, int, str]] = []
+    seen_addresses = set()
+
+    def _on_detection(device: BLEDevice, adv_data: AdvertisementData) -> None:
+        # 过滤信号过弱或名称不匹配的广播
+        if adv_data.rssi < min_rssi:
+            return
+        if not device.name or DeviceUUID.DEVICE_NAME_PREFIX not in device.name:
+            return
+        # 同一设备的重复广播只记录一次
+        if device.address in seen_addresses:
+            return
+        seen_addresses.add(device.address)
+        logger.info(f"找到设备: {device.name} ({device.address}), RSSI: {adv_data.rssi}")
+        dglab_devices.append((device.address, adv_data.rssi, device.name))
+
+    scanner = BleakScanner(
+        detection_callback=_on_detection,
+        service_uuids=[DeviceUUID.SERVICE_ESTIM]
+    )
+    await scanner.start()
+    await asyncio.sleep(timeout)
+    await scanner.stop()
+
     if not dglab_devices:
         logger.warning("未找到DG-LAB V2设备")
     else:
         logger.info(f"找到 {len(dglab_devices)} 个DG-LAB V2设备")
-    
+
+    # 按信号强度排序，调用方可直接取第一个作为信号最强的设备
+    # itemgetter是C实现的取键函数，比Python层的lambda开销更低
+    dglab_devices.sort(key=itemgetter(1), reverse=True)
     return dglab_devices
 
 
+def pack_wave_value(wave_x: int, wave_y: int, wave_z: int) -> int:
+    """
+    将三个波形参数合并为设备要求的24位整数
+
+    Z参数在高位，Y参数在中间10位，X参数在低5位；
+    独立的纯整数函数，所有波形写入路径共用同一份打包逻辑
+
+    Args:
+        wave_x: 波形X参数 (0-31)
+        wave_y: 波形Y参数 (0-1023)
+        wave_z: 波形Z参数 (0-31)
+
+    Returns:
+        int: 合并后的24位整数
+    """
+    return (wave_z << 15) | (wave_y << 5) | wave_x
+
+
+def pack_wave_frames(waves: Tuple[Tuple[int, int, int], ...]) -> List[bytearray]:
+    """
+    将波形帧列表预打包为可直接写入特征的字节载荷
+
+    波形预设是固定数据，在设置预设时打包一次即可，
+    避免波形控制循环每100ms重复做范围限制、位运算和字节分配
+
+    Args:
+        waves: 波形帧列表，每项为(wave_x, wave_y, wave_z)
+
+    Returns:
+        List[bytearray]: 每帧对应的3字节载荷
+    """
+    frames = []
+    for wave_x, wave_y, wave_z in waves:
+        wave_x = max(0, min(31, wave_x))
+        wave_y = max(0, min(1023, wave_y))
+        wave_z = max(0, min(31, wave_z))
+        frames.append(bytearray(_PACK_LE32(pack_wave_value(wave_x, wave_y, wave_z))[:3]))
+    return frames
+
+
 async def get_battery_level(client: BleakClient) -> int:
     """
     获取设备电池电量
@@ -90,23 +175,25 @@ async def get_strength(client: BleakClient) -> Tuple[int, int]:
         
         # 获取原始字节
         array = bytes(value)
-        logger.debug(f"读取强度原始字节: {array.hex()}")
-        
+
         # 解码为24位整数
         raw_value = int.from_bytes(array[:3], byteorder="little")
-        logger.debug(f"读取强度原始24位整数: {raw_value} (二进制: {bin(raw_value)})")
-        
+
         # 从24位整数中提取两个强度值
         # 我们发现设备返回的是设置值的两倍，所以在这里除以2
         strength_a_raw = ((raw_value >> 11) & 0x7FF) // 2  # 取高13位再除以2
         strength_b_raw = (raw_value & 0x7FF) // 2  # 取低11位再除以2
-        logger.debug(f"解析后的原始强度值(已调整): A={strength_a_raw} (二进制: {bin(strength_a_raw)}), B={strength_b_raw} (二进制: {bin(strength_b_raw)})")
-        
+
         # 将设备范围(0-1023)转换为应用范围(0-100)
         channel_a = min(100, max(0, int(strength_a_raw * 100 / 1023)))
         channel_b = min(100, max(0, int(strength_b_raw * 100 / 1023)))
-        
-        logger.debug(f"当前强度: A={channel_a}, B={channel_b} (调整后原始值: A={strength_a_raw}, B={strength_b_raw})")
+
+        # 调试信息包含hex()/bin()格式化，仅在DEBUG级别启用时构建字符串
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"读取强度原始字节: {array.hex()}")
+            logger.debug(f"读取强度原始24位整数: {raw_value} (二进制: {bin(raw_value)})")
+            logger.debug(f"解析后的原始强度值(已调整): A={strength_a_raw} (二进制: {bin(strength_a_raw)}), B={strength_b_raw} (二进制: {bin(strength_b_raw)})")
+            logger.debug(f"当前强度: A={channel_a}, B={channel_b} (调整后原始值: A={strength_a_raw}, B={strength_b_raw})")
         return channel_a, channel_b
     except Exception as e:
         logger.error(f"获取强度错误: {e}")
@@ -125,38 +212,35 @@ async def set_strength(client: BleakClient, channel_a: int, channel_b: int) -> b
     Returns:
         bool: 设置是否成功
     """
-    # 强度值限制在0-100范围内
-    channel_a = max(0, min(100, channel_a))
-    channel_b = max(0, min(100, channel_b))
-    
-    # 将0-100的强度值换算为设备原生的0-1023范围
-    strength_a = int(channel_a * 1023 / 100)
-    strength_b = int(channel_b * 1023 / 100)
-    
-    # 限制在有效范围内
-    strength_a = min(1023, max(0, strength_a))
-    strength_b = min(1023, max(0, strength_b))
-    logger.debug(f"转换后的原始强度值: A={strength_a} (二进制: {bin(strength_a)}), B={strength_b} (二进制: {bin(strength_b)})")
-    
+    # 强度值限制在0-100范围内（融合条件表达式，避免min/max函数调用）
+    channel_a = 0 if channel_a < 0 else (100 if channel_a > 100 else channel_a)
+    channel_b = 0 if channel_b < 0 else (100 if channel_b > 100 else channel_b)
+
+    # 查表得到设备原生范围(0-1023)乘2后的值
+    # （我们发现需要将值乘以2才能匹配设备读取的值）
+    strength_a = _STRENGTH_LUT[channel_a]
+    strength_b = _STRENGTH_LUT[channel_b]
+
     try:
-        # 我们发现需要将值乘以2才能匹配设备读取的值
-        strength_a = strength_a * 2
-        strength_b = strength_b * 2
-        logger.debug(f"调整后的原始强度值(已乘2): A={strength_a} (二进制: {bin(strength_a)}), B={strength_b} (二进制: {bin(strength_b)})")
-        
         # 按照设备要求的格式打包数据
         # 使用位操作将两个强度值合并为一个24位的整数
         # 然后转换为3字节的little-endian格式
         combined_value = (strength_a << 11) + strength_b
-        logger.debug(f"合并后的24位整数: {combined_value} (二进制: {bin(combined_value)})")
-        
-        array = combined_value.to_bytes(3, byteorder="little")
-        
-        logger.debug(f"设置强度原始字节: {array.hex()} (原始值: A={strength_a//2}, B={strength_b//2})")
-        
+
+        array = _strength_buf
+        array[0] = combined_value & 0xFF
+        array[1] = (combined_value >> 8) & 0xFF
+        array[2] = (combined_value >> 16) & 0xFF
+
+        # 调试信息包含hex()/bin()格式化，仅在DEBUG级别启用时构建字符串
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"转换后的原始强度值(已乘2): A={strength_a} (二进制: {bin(strength_a)}), B={strength_b} (二进制: {bin(strength_b)})")
+            logger.debug(f"合并后的24位整数: {combined_value} (二进制: {bin(combined_value)})")
+            logger.debug(f"设置强度原始字节: {array.hex()} (原始值: A={strength_a//2}, B={strength_b//2})")
+
         await client.write_gatt_char(
-            DeviceUUID.CHAR_ESTIM_POWER, 
-            bytearray(array),
+            DeviceUUID.CHAR_ESTIM_POWER,
+            array,
             response=False
         )
         return True
@@ -185,21 +269,19 @@ async def set_wave(
     Returns:
         bool: 设置是否成功
     """
-    # 参数值限制在合理范围内
-    wave_x = max(0, min(31, wave_x))
-    wave_y = max(0, min(1023, wave_y))
-    wave_z = max(0, min(31, wave_z))
-    
+    # 参数值限制在合理范围内（融合条件表达式，避免min/max函数调用）
+    wave_x = 0 if wave_x < 0 else (31 if wave_x > 31 else wave_x)
+    wave_y = 0 if wave_y < 0 else (1023 if wave_y > 1023 else wave_y)
+    wave_z = 0 if wave_z < 0 else (31 if wave_z > 31 else wave_z)
+
     try:
-        # 使用位操作将三个波形参数合并为一个24位整数
-        # Z参数在高8位，Y参数在中间10位，X参数在低5位
-        value = ((wave_z << 15) + (wave_y << 5) + wave_x)
-        array = value.to_bytes(3, byteorder="little")
+        value = pack_wave_value(wave_x, wave_y, wave_z)
+        array = _PACK_LE32(value)[:3]
         
     #    logger.debug(f"设置通道{channel}波形原始字节: {array.hex()}")
         
         # 根据通道选择特征UUID
-        char_uuid = DeviceUUID.CHAR_ESTIM_A if channel == 'A' else DeviceUUID.CHAR_ESTIM_B
+        char_uuid = _CHANNEL_CHAR_MAP.get(channel, DeviceUUID.CHAR_ESTIM_B)
         
         await client.write_gatt_char(
             char_uuid, 
@@ -10,14 +10,15 @@ from bleak import BleakClient
 from bleak.exc import BleakError
 
 from .bluetooth import (
-    scan_devices, 
-    get_battery_level, 
-    get_strength, 
+    scan_devices,
+    get_battery_level,
+    get_strength,
     set_strength,
-    set_wave,
+    pack_wave_value,
+    pack_wave_frames,
     DeviceUUID
 )
-from .models import ChannelA, ChannelB, DGLabState, WaveSet
+from .models import Channel, DGLabState, WaveSet
 
 # 设置日志
 logger = logging.getLogger(__name__)
@@ -37,12 +38,34 @@ class DGLabDevice:
         self.state.device_address = device_address
         self.client: Optional[BleakClient] = None
         self.wave_task: Optional[asyncio.Task] = None
-        self._channel_a_wave_set: List[Tuple[int, int, int]] = []
-        self._channel_b_wave_set: List[Tuple[int, int, int]] = []
+        self._channel_a_wave_set: Tuple[Tuple[int, int, int], ...] = ()
+        self._channel_b_wave_set: Tuple[Tuple[int, int, int], ...] = ()
+        # 预设波形的预打包字节载荷，与wave_set一一对应
+        self._channel_a_packed: List[bytearray] = []
+        self._channel_b_packed: List[bytearray] = []
+        # 每通道最近一次成功发送的波形载荷；设备会锁存波形参数，
+        # 相同的帧无需重复写入
+        self._last_sent_a: Optional[bytearray] = None
+        self._last_sent_b: Optional[bytearray] = None
         self._wave_index_a: int = 0
         self._wave_index_b: int = 0
+        # 每通道复用的3字节写入缓冲区，手动设置波形时原地改写，
+        # 避免每次写入分配新的bytes+bytearray
+        self._buf_a = bytearray(3)
+        self._buf_b = bytearray(3)
+        # 通道到(特征UUID, 写入缓冲区, 通道状态)的映射，替代字符串分支
+        self._channel_map: Dict[str, Tuple[str, bytearray, Channel]] = {
+            'A': (DeviceUUID.CHAR_ESTIM_A, self._buf_a, self.state.channel_a),
+            'B': (DeviceUUID.CHAR_ESTIM_B, self._buf_b, self.state.channel_b),
+        }
         self._stop_event = asyncio.Event()
-    
+        # 电池电量缓存时间戳与TTL（秒）：电量变化远慢于状态轮询频率，
+        # 按TTL缓存可避免每次get_state都触发数百毫秒的GATT读取
+        self._battery_ts: float = 0.0
+        self._battery_ttl: float = 30.0
+        # 进行中的电量读取任务：并发调用共享同一次GATT读取（single-flight）
+        self._battery_inflight: Optional[asyncio.Task] = None
+
     @property
     def is_connected(self) -> bool:
         """设备是否已连接"""
@@ -71,8 +94,7 @@ class DGLabDevice:
         if not devices:
             raise RuntimeError("未找到DG-LAB V2设备")
         
-        # 按信号强度排序，连接信号最强的设备
-        devices.sort(key=lambda x: x[1], reverse=True)
+        # scan_devices已按信号强度排序，第一个即信号最强的设备
         best_device = devices[0]
         
         logger.info(f"连接信号最强的设备: {best_device[2]} ({best_device[0]})")
@@ -105,16 +127,14 @@ class DGLabDevice:
             # 创建客户端并连接
             self.client = BleakClient(self.state.device_address, timeout=timeout)
             await self.client.connect()
-            
-            # 等待服务发现完成
-            await asyncio.sleep(1)
-            
-            # 验证设备服务
-            services = self.client.services
-            service_uuids = [service.uuid for service in services]
-            
-            if (DeviceUUID.SERVICE_BATTERY in service_uuids and 
-                DeviceUUID.SERVICE_ESTIM in service_uuids):
+
+            # bleak在connect()返回时已完成服务发现（BlueZ/CoreBluetooth/WinRT
+            # 后端均如此），无需再人为等待
+            # 验证设备服务：集合一次遍历完成两个UUID的成员判断
+            service_uuids = {service.uuid for service in self.client.services}
+            required_services = {DeviceUUID.SERVICE_BATTERY, DeviceUUID.SERVICE_ESTIM}
+
+            if required_services.issubset(service_uuids):
                 logger.info("设备连接成功，已验证为DG-LAB V2设备")
                 self.state.connected = True
                 
@@ -128,8 +148,12 @@ class DGLabDevice:
                 await self.set_wave(0, 0, 0, channel='B')
                 
                 # 重置波形设置
-                self._channel_a_wave_set = []
-                self._channel_b_wave_set = []
+                self._channel_a_wave_set = ()
+                self._channel_b_wave_set = ()
+                self._channel_a_packed = []
+                self._channel_b_packed = []
+                self._last_sent_a = None
+                self._last_sent_b = None
                 
                 # 启动波形控制
                 self._start_wave_control()
@@ -176,15 +200,31 @@ class DGLabDevice:
     async def update_battery(self) -> int:
         """
         更新电池电量
-        
+
+        并发调用会共享同一次GATT读取（single-flight），
+        避免多个状态轮询同时在BLE链路上排队读电量
+
         Returns:
             int: 电池电量百分比
         """
         if not self.is_connected:
             raise RuntimeError("设备未连接")
-        
+
+        if self._battery_inflight is not None:
+            return await asyncio.shield(self._battery_inflight)
+
+        task = asyncio.create_task(self._read_battery())
+        self._battery_inflight = task
+        try:
+            return await task
+        finally:
+            self._battery_inflight = None
+
+    async def _read_battery(self) -> int:
+        """实际执行电量GATT读取并更新缓存"""
         battery = await get_battery_level(self.client)
         self.state.battery = battery
+        self._battery_ts = asyncio.get_running_loop().time()
         logger.info(f"电池电量: {battery}%")
         return battery
     
@@ -200,7 +240,8 @@ class DGLabDevice:
         
         # 读取设备当前强度值，但只记录在日志中，不更新UI
         strength_a, strength_b = await get_strength(self.client)
-        logger.debug(f"设备返回的强度: A={strength_a}, B={strength_b}，UI显示值: A={self.state.channel_a.strength}, B={self.state.channel_b.strength}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"设备返回的强度: A={strength_a}, B={strength_b}，UI显示值: A={self.state.channel_a.strength}, B={self.state.channel_b.strength}")
         
         # 返回UI中设置的值，而不是设备返回的值
         return self.state.channel_a.strength, self.state.channel_b.strength
@@ -259,34 +300,69 @@ class DGLabDevice:
         if not self.is_connected:
             raise RuntimeError("设备未连接")
         
-        channel = channel.upper()
-        if channel not in ['A', 'B']:
+        try:
+            char_uuid, buf, channel_state = self._channel_map[channel.upper()]
+        except KeyError:
             raise ValueError("通道必须是 'A' 或 'B'")
-        
-        success = await set_wave(
-            self.client, 
-            channel, 
-            wave_x, 
-            wave_y, 
-            wave_z
-        )
-        
+
+        success = await self._write_wave_fast(char_uuid, buf, wave_x, wave_y, wave_z)
+
         if success:
-            if channel == 'A':
-                self.state.channel_a.wave_x = wave_x
-                self.state.channel_a.wave_y = wave_y
-                self.state.channel_a.wave_z = wave_z
+            channel_state.wave_x = wave_x
+            channel_state.wave_y = wave_y
+            channel_state.wave_z = wave_z
+            # 手动写入改变了设备上锁存的波形，波形循环的去重状态随之失效
+            if channel_state is self.state.channel_a:
+                self._last_sent_a = None
             else:
-                self.state.channel_b.wave_x = wave_x
-                self.state.channel_b.wave_y = wave_y
-                self.state.channel_b.wave_z = wave_z
-                
+                self._last_sent_b = None
         #    logger.debug(f"设置通道{channel}波形成功: X={wave_x}, Y={wave_y}, Z={wave_z}")
         else:
             logger.error(f"设置通道{channel}波形失败")
-        
+
         return success
     
+    async def _write_wave_fast(
+        self,
+        char_uuid: str,
+        buf: bytearray,
+        wave_x: int,
+        wave_y: int,
+        wave_z: int
+    ) -> bool:
+        """
+        将波形参数打包进复用缓冲区并写入特征
+
+        bleak在组包时会复制缓冲区内容，写入在单个事件循环内串行执行，
+        因此原地改写每通道固定的缓冲区是安全的
+
+        Args:
+            char_uuid: 通道对应的特征UUID
+            buf: 该通道复用的3字节缓冲区
+            wave_x: 波形X参数 (0-31)
+            wave_y: 波形Y参数 (0-1023)
+            wave_z: 波形Z参数 (0-31)
+
+        Returns:
+            bool: 写入是否成功
+        """
+        # 参数值限制在合理范围内
+        wave_x = 0 if wave_x < 0 else (31 if wave_x > 31 else wave_x)
+        wave_y = 0 if wave_y < 0 else (1023 if wave_y > 1023 else wave_y)
+        wave_z = 0 if wave_z < 0 else (31 if wave_z > 31 else wave_z)
+
+        value = pack_wave_value(wave_x, wave_y, wave_z)
+        buf[0] = value & 0xFF
+        buf[1] = (value >> 8) & 0xFF
+        buf[2] = (value >> 16) & 0xFF
+
+        try:
+            await self.client.write_gatt_char(char_uuid, buf, response=False)
+            return True
+        except Exception as e:
+            logger.error(f"设置波形错误: {e}")
+            return False
+
     async def set_wave_preset(
         self, 
         preset_name: str, 
@@ -308,12 +384,19 @@ class DGLabDevice:
         if channel not in ['A', 'B']:
             raise ValueError("通道必须是 'A' 或 'B'")
         
+        # 在设置预设时打包一次字节载荷，波形循环直接按索引写入
+        packed = pack_wave_frames(wave_set)
+
         if channel == 'A':
             self._channel_a_wave_set = wave_set
+            self._channel_a_packed = packed
             self._wave_index_a = 0
+            self._last_sent_a = None
         else:
             self._channel_b_wave_set = wave_set
+            self._channel_b_packed = packed
             self._wave_index_b = 0
+            self._last_sent_b = None
         
         logger.info(f"设置通道{channel}波形预设: {preset_name}")
         return True
@@ -326,25 +409,71 @@ class DGLabDevice:
         self._stop_event.clear()
         self.wave_task = asyncio.create_task(self._wave_control_loop())
     
+    # 波形切换周期（秒），官方建议的0.1秒，确保波形输出符合规范
+    WAVE_TICK_INTERVAL = 0.1
+
     async def _wave_control_loop(self) -> None:
         """波形控制循环，自动切换波形"""
         logger.info("启动波形控制循环")
         try:
+            loop = asyncio.get_running_loop()
+            # 使用单调时钟的绝对截止时间调度，避免BLE写入耗时
+            # 累积到周期里导致波形节奏越走越慢
+            next_tick = loop.time()
             while not self._stop_event.is_set() and self.is_connected:
-                # 处理通道A波形
-                if self._channel_a_wave_set:
-                    wave = self._channel_a_wave_set[self._wave_index_a]
-                    await self.set_wave(wave[0], wave[1], wave[2], channel='A')
-                    self._wave_index_a = (self._wave_index_a + 1) % len(self._channel_a_wave_set)
-                
-                # 处理通道B波形
-                if self._channel_b_wave_set:
-                    wave = self._channel_b_wave_set[self._wave_index_b]
-                    await self.set_wave(wave[0], wave[1], wave[2], channel='B')
-                    self._wave_index_b = (self._wave_index_b + 1) % len(self._channel_b_wave_set)
+                # 两个通道的写入并发提交，write-without-response不等待回包，
+                # bleak可将两个数据包排进同一个BLE连接间隔
+                writes = []
+                channels = []
+                payloads = {}
+                if self._channel_a_packed:
+                    payload = self._channel_a_packed[self._wave_index_a]
+                    # 设备会锁存波形参数，与上次发送相同的帧直接跳过
+                    if payload != self._last_sent_a:
+                        writes.append(self.client.write_gatt_char(
+                            DeviceUUID.CHAR_ESTIM_A,
+                            payload,
+                            response=False
+                        ))
+                        channels.append('A')
+                        payloads['A'] = payload
+                if self._channel_b_packed:
+                    payload = self._channel_b_packed[self._wave_index_b]
+                    if payload != self._last_sent_b:
+                        writes.append(self.client.write_gatt_char(
+                            DeviceUUID.CHAR_ESTIM_B,
+                            payload,
+                            response=False
+                        ))
+                        channels.append('B')
+                        payloads['B'] = payload
+
+                if writes:
+                    results = await asyncio.gather(*writes, return_exceptions=True)
+                    for channel, result in zip(channels, results):
+                        if isinstance(result, Exception):
+                            logger.error(f"设置通道{channel}波形失败: {result}")
+                        elif channel == 'A':
+                            self._last_sent_a = payloads['A']
+                            self.state.channel_a.wave = self._channel_a_wave_set[self._wave_index_a]
+                        else:
+                            self._last_sent_b = payloads['B']
+                            self.state.channel_b.wave = self._channel_b_wave_set[self._wave_index_b]
+
+                # 无论本周期是否实际写入，波形索引都照常推进
+                if self._channel_a_packed:
+                    self._wave_index_a = (self._wave_index_a + 1) % len(self._channel_a_packed)
+                if self._channel_b_packed:
+                    self._wave_index_b = (self._wave_index_b + 1) % len(self._channel_b_packed)
                 
-                # 等待
-                await asyncio.sleep(0.1)  # 改回官方建议的0.1秒，确保波形输出符合规范
+                # 等待到下一个周期截止点
+                next_tick += self.WAVE_TICK_INTERVAL
+                delay = next_tick - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                elif delay < -0.5:
+                    # 长时间卡顿后重新对齐，避免补发积压的周期
+                    next_tick = loop.time()
         except asyncio.CancelledError:
             logger.info("波形控制任务被取消")
         except Exception as e:
@@ -352,16 +481,22 @@ class DGLabDevice:
         finally:
             logger.info("波形控制循环结束")
             
-    async def get_state(self) -> Dict[str, Any]:
+    async def get_state(self, force_refresh: bool = False) -> Dict[str, Any]:
         """
         获取设备完整状态
-        
+
+        Args:
+            force_refresh: 是否强制重新读取电池电量，忽略缓存TTL
+
         Returns:
             Dict: 设备状态信息
         """
         # 只读取电池电量，不读取强度，因为我们不想用设备值覆盖UI值
+        # 电量读取按TTL缓存，状态轮询大多数时候直接返回内存中的值
         if self.is_connected:
-            await self.update_battery()
+            now = asyncio.get_running_loop().time()
+            if force_refresh or now - self._battery_ts > self._battery_ttl:
+                await self.update_battery()
             # 不再调用 await self.update_strength()
         
         return {
@@ -9,54 +9,53 @@ import logging
 from typing import Optional, List, Tuple, Dict
 from dataclasses import dataclass, field
 
+# 优先使用libyaml的C实现加载器，比纯Python实现快一个数量级
+try:
+    from yaml import CSafeLoader as _YamlSafeLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlSafeLoader
+
 
 # 设置日志
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class ChannelA:
-    """A通道数据模型"""
-    strength: int = 0
-    wave_x: int = 0
-    wave_y: int = 0  
-    wave_z: int = 0
+class Channel:
+    """通道数据模型
 
-    @property
-    def wave(self) -> Tuple[int, int, int]:
-        """获取波形参数元组"""
-        return (self.wave_x, self.wave_y, self.wave_z)
-    
-    @wave.setter
-    def wave(self, value: Tuple[int, int, int]):
-        """设置波形参数"""
-        self.wave_x, self.wave_y, self.wave_z = value
+    A/B通道结构完全相同，共用一个类型；使用__slots__去掉
+    每实例的__dict__，属性访问按固定偏移进行
+    """
 
+    __slots__ = ("strength", "wave_x", "wave_y", "wave_z")
+
+    def __init__(self, strength: int = 0, wave_x: int = 0, wave_y: int = 0, wave_z: int = 0):
+        self.strength = strength
+        self.wave_x = wave_x
+        self.wave_y = wave_y
+        self.wave_z = wave_z
 
-@dataclass
-class ChannelB:
-    """B通道数据模型"""
-    strength: int = 0
-    wave_x: int = 0
-    wave_y: int = 0
-    wave_z: int = 0
-    
     @property
     def wave(self) -> Tuple[int, int, int]:
         """获取波形参数元组"""
         return (self.wave_x, self.wave_y, self.wave_z)
-    
+
     @wave.setter
     def wave(self, value: Tuple[int, int, int]):
         """设置波形参数"""
         self.wave_x, self.wave_y, self.wave_z = value
 
 
+# 向后兼容的别名
+ChannelA = Channel
+ChannelB = Channel
+
+
 @dataclass
 class DGLabState:
     """DG-LAB设备状态数据模型"""
-    channel_a: ChannelA = field(default_factory=ChannelA)
-    channel_b: ChannelB = field(default_factory=ChannelB)
+    channel_a: Channel = field(default_factory=Channel)
+    channel_b: Channel = field(default_factory=Channel)
     battery: int = 0
     connected: bool = False
     device_address: str = ""
@@ -67,8 +66,9 @@ class WaveSet:
     """波形预设集合"""
     
     # 默认波形预设，当配置文件不可用时使用
+    # 预设为不可变的元组嵌套，get_preset直接返回共享引用而无需复制
     DEFAULT_WAVE_PRESET = {
-        "Going_Faster": [
+        "Going_Faster": (
             (5, 135, 20),
             (5, 125, 20),
             (5, 115, 20),
@@ -84,66 +84,75 @@ class WaveSet:
             (2, 18, 20),
             (1, 14, 20),
             (1, 9, 20),
-        ],
-        "Constant": [
+        ),
+        "Constant": (
             (8, 512, 15),
-        ],
-        "Pulse": [
+        ),
+        "Pulse": (
             (10, 600, 15),
             (0, 0, 0),
-        ],
-        "Wave": [
+        ),
+        "Wave": (
             (5, 200, 10),
             (8, 300, 15),
             (12, 400, 20),
             (15, 500, 25),
             (12, 400, 20),
             (8, 300, 15),
-        ],
-        "Intense": [
+        ),
+        "Intense": (
             (15, 700, 25),
             (20, 800, 30),
             (25, 900, 30),
             (20, 800, 30),
             (15, 700, 25),
             (0, 0, 0),
-        ],
-        "Rhythm": [
+        ),
+        "Rhythm": (
             (15, 600, 20),
             (0, 0, 0),
             (15, 600, 20),
             (0, 0, 0),
             (15, 600, 20),
             (0, 0, 0),
-        ],
+        ),
     }
     
     # 从配置文件加载的波形预设
     WAVE_PRESET = {}
+
+    # 预设名称缓存，仅在load_wave_presets时重建，
+    # 避免get_preset_names在每次状态查询时重新遍历字典
+    _preset_names_cache: Tuple[str, ...] = ()
+
+    # 预设是否已加载，保证load_wave_presets的文件检查和YAML解析只执行一次
+    _loaded: bool = False
     
     @classmethod
     def load_wave_presets(cls):
         """从配置文件加载波形预设"""
+        cls._loaded = True
         config_path = os.path.join(os.getcwd(), "waveconfig.yaml")
         
         # 如果配置文件存在，尝试加载
         if os.path.exists(config_path):
             try:
                 with open(config_path, "r", encoding="utf-8") as f:
-                    config = yaml.safe_load(f)
+                    config = yaml.load(f, Loader=_YamlSafeLoader)
                 
                 if config and "presets" in config:
                     # 转换YAML列表格式为元组格式
                     presets_dict = {}
                     for name, waves in config["presets"].items():
-                        preset_waves = []
-                        for wave in waves:
-                            if isinstance(wave, list) and len(wave) == 3:
-                                preset_waves.append(tuple(wave))
+                        preset_waves = tuple(
+                            tuple(wave) for wave in waves
+                            if isinstance(wave, list) and len(wave) == 3
+                        )
                         if preset_waves:
                             presets_dict[name] = preset_waves
                     
                     cls.WAVE_PRESET = presets_dict
+                    cls._preset_names_cache = tuple(cls.WAVE_PRESET.keys())
                     logger.info(f"已从配置文件加载 {len(cls.WAVE_PRESET)} 个波形预设")
                     return
             except Exception as e:
@@ -151,6 +160,7 @@ class WaveSet:
         
         # 如果加载失败或配置文件不存在，使用默认预设
         cls.WAVE_PRESET = cls.DEFAULT_WAVE_PRESET.copy()
+        cls._preset_names_cache = tuple(cls.WAVE_PRESET.keys())
         logger.info("使用默认波形预设")
         
         # 尝试创建默认配置文件
@@ -168,19 +178,19 @@ class WaveSet:
                 logger.error(f"创建波形预设配置文件失败: {str(e)}")
     
     @classmethod
-    def get_preset(cls, name: str) -> List[Tuple[int, int, int]]:
-        """获取预设波形"""
-        # 如果预设集合为空，先加载预设
-        if not cls.WAVE_PRESET:
+    def get_preset(cls, name: str) -> Tuple[Tuple[int, int, int], ...]:
+        """获取预设波形（共享的不可变元组，调用方不应修改）"""
+        # 首次访问时加载预设
+        if not cls._loaded:
             cls.load_wave_presets()
-        
-        return cls.WAVE_PRESET.get(name, cls.WAVE_PRESET.get("Constant", [(8, 512, 15)]))
+
+        return cls.WAVE_PRESET.get(name, cls.WAVE_PRESET.get("Constant", ((8, 512, 15),)))
     
     @classmethod
     def get_preset_names(cls) -> List[str]:
         """获取所有预设波形名称"""
-        # 如果预设集合为空，先加载预设
-        if not cls.WAVE_PRESET:
+        # 首次访问时加载预设
+        if not cls._loaded:
             cls.load_wave_presets()
-            
-        return list(cls.WAVE_PRESET.keys()) 
\ No newline at end of file
+
+        return list(cls._preset_names_cache) 
\ No newline at end of file
@@ -18,6 +18,15 @@ from core.dglab_device import DGLabDevice
 from server.ws_server import DGLabWebSocketServer
 from plugins.plugin_loader import PluginLoader
 
+# 在非Windows平台上优先使用uvloop（libuv后端的事件循环，
+# 回调分发开销更低），未安装时静默回退到默认事件循环
+if platform.system() != "Windows":
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -4,12 +4,30 @@
 """
 
 import asyncio
+import json
 import logging
 import os
+import time
 import yaml
-from typing import Dict, Any
+from typing import Dict, Any, List
 from bleak import BleakClient
 
+# 优先使用libyaml的C实现加载器/序列化器，未安装时回退到纯Python实现
+try:
+    from yaml import CSafeLoader as _YamlSafeLoader, CSafeDumper as _YamlSafeDumper
+except ImportError:
+    from yaml import SafeLoader as _YamlSafeLoader, SafeDumper as _YamlSafeDumper
+
+# JSON序列化优先使用orjson（C实现），未安装时回退到标准库
+try:
+    import orjson
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+except ImportError:
+    def _json_dumps(obj: Any) -> str:
+        return json.dumps(obj)
+
 # 设置日志
 logger = logging.getLogger(__name__)
 
@@ -18,6 +36,25 @@ ws_server = None
 device = None
 config = None
 monitor_task = None
+flusher_task = None
+
+# 待广播的状态消息队列：消息先积攒在这里，由_flusher任务
+# 在短时间窗口内合并为一条批量广播，减少每条消息的帧和发送开销
+_pending: List[Dict[str, str]] = []
+_flush_evt: asyncio.Event = None
+
+# 合并窗口（秒），窗口内到达的消息进入同一批
+_FLUSH_WINDOW = 0.02
+
+# 批量广播的固定外层结构：只有items部分是变化的，
+# 外层不必每次重建dict再整体序列化
+_BATCH_PREFIX = '{"type":"plugin_device_monitor_batch","items":'
+_BATCH_SUFFIX = '}'
+
+# 电量读取新鲜度窗口（秒）：窗口内的重复状态查询直接用缓存值，
+# 避免高频轮询把每次查询都变成一次BLE连接事件
+_BATTERY_FRESH_S = 5.0
+_bat_ts = 0.0
 
 # 默认配置
 DEFAULT_CONFIG = {
@@ -34,12 +71,11 @@ def set_ws_server(server):
     """设置WebSocket服务器引用"""
     global ws_server, device
     ws_server = server
-    # 获取设备引用
-    if hasattr(server, 'device'):
-        device = server.device
+    # 获取设备引用（getattr单次查找，避免hasattr+属性访问两次遍历MRO）
+    device = getattr(server, 'device', None)
 
-async def load_config() -> None:
-    """加载插件配置"""
+def load_config() -> None:
+    """加载插件配置（同步执行：配置文件很小，启动时读一次磁盘即可）"""
     global config
     
     # 配置文件路径
@@ -50,7 +86,7 @@ async def load_config() -> None:
     if os.path.exists(yaml_config_path):
         try:
             with open(yaml_config_path, "r", encoding="utf-8") as f:
-                config = yaml.safe_load(f)
+                config = yaml.load(f, Loader=_YamlSafeLoader)
             logger.info("已从YAML文件加载配置")
             return
         except Exception as e:
@@ -62,21 +98,23 @@ async def load_config() -> None:
     # 创建YAML配置文件
     try:
         with open(yaml_config_path, "w", encoding="utf-8") as f:
-            yaml.dump(config, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+            yaml.dump(config, f, Dumper=_YamlSafeDumper, default_flow_style=False, allow_unicode=True, sort_keys=False)
         logger.info("已创建默认YAML配置文件")
     except Exception as e:
         logger.error(f"创建YAML配置文件失败: {str(e)}")
 
 def setup() -> None:
     """插件初始化"""
-    global config, monitor_task
-    
-    # 加载配置
-    asyncio.ensure_future(load_config())
-    
-    # 启动监控任务
+    global config, monitor_task, flusher_task, _flush_evt
+
+    # 同步加载配置，保证监控任务启动时配置已就绪
+    load_config()
+
+    # 启动监控任务和广播合并任务
+    _flush_evt = asyncio.Event()
     monitor_task = asyncio.create_task(check_device_status())
-    
+    flusher_task = asyncio.create_task(_flush_pending())
+
     logger.info("设备监控插件已初始化")
 
 async def handle_message(device, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -105,8 +143,8 @@ async def handle_message(device, data: Dict[str, Any]) -> Dict[str, Any]:
         if action == "get_status":
             # 获取当前状态
             if device and device.is_connected:
-                # 确保状态已更新
-                await device.update_battery()
+                # 电量值在新鲜度窗口内直接用缓存，过期才真正读BLE
+                await _update_battery_fresh(device)
                 battery_level = device.state.battery
                 return {
                     "status": "success",
@@ -132,36 +170,66 @@ async def handle_message(device, data: Dict[str, Any]) -> Dict[str, Any]:
         logger.error(f"处理消息时出错: {e}")
         return {"status": "error", "message": str(e)}
 
+async def _update_battery_fresh(device) -> None:
+    """电量读取的新鲜度保护：距上次读取不足_BATTERY_FRESH_S秒时跳过"""
+    global _bat_ts
+    now = time.monotonic()
+    if now - _bat_ts > _BATTERY_FRESH_S:
+        await device.update_battery()
+        _bat_ts = time.monotonic()
+
 async def check_device_status() -> None:
     """定期检查设备状态"""
     global device, config
     
-    # 等待配置加载完成
-    while config is None:
-        await asyncio.sleep(0.1)
-    
+    # 上次观察到的状态，未变化时不重复广播
+    last_battery = None
+    last_connected = None
+    # 状态连续未变化的次数，用于指数退避拉长轮询间隔
+    stable_ticks = 0
+    # 退避上限（秒）
+    max_interval = 300
+
+    # 配置在setup时加载后不再变化，循环外绑定一次即可
+    monitor_cfg = config["monitor"]
+    interval = monitor_cfg["check_interval"]
+    warning_level = monitor_cfg["battery_warning"]
+
     while True:
         try:
             if device and device.is_connected:
-                # 检查电池电量
-                await device.update_battery()
+                # 检查电池电量（新鲜度窗口内复用缓存值）
+                await _update_battery_fresh(device)
                 battery_level = device.state.battery
-                
-                # 如果电池电量低于警告阈值，发送警告
-                if battery_level <= config["monitor"]["battery_warning"]:
-                    await broadcast_status(
-                        f"电池电量低: {battery_level}%",
-                        "warning"
-                    )
-                
+
+                if battery_level <= warning_level:
+                    # 接近警告阈值时恢复基础轮询频率；
+                    # 电量值未变化就不重复发送同样的警告
+                    stable_ticks = 0
+                    if battery_level != last_battery or last_connected is not True:
+                        await broadcast_status(
+                            f"电池电量低: {battery_level}%",
+                            "warning"
+                        )
+                elif battery_level == last_battery and last_connected is True:
+                    # 状态稳定且电量充足：指数退避减少BLE读取
+                    stable_ticks += 1
+                else:
+                    stable_ticks = 0
+
+                last_battery = battery_level
+                last_connected = True
+
             elif device:
+                last_connected = False
+                stable_ticks = 0
                 await handle_disconnection()
-                
-            await asyncio.sleep(config["monitor"]["check_interval"])
-            
+
+            await asyncio.sleep(min(interval * (2 ** stable_ticks), max_interval))
+
         except Exception as e:
             logger.error(f"检查设备状态时出错: {e}")
-            await asyncio.sleep(config["monitor"]["check_interval"])
+            await asyncio.sleep(interval)
 
 async def handle_disconnection() -> None:
     """处理设备断开连接"""
@@ -172,12 +240,16 @@ async def handle_disconnection() -> None:
         logger.warning("配置尚未加载，使用默认值")
         config = DEFAULT_CONFIG.copy()
     
-    if not config["monitor"]["auto_reconnect"]:
+    monitor_cfg = config["monitor"]
+    if not monitor_cfg["auto_reconnect"]:
         await broadcast_status("设备已断开连接", "error")
         return
-        
+
+    max_attempts = monitor_cfg["max_reconnect_attempts"]
+    reconnect_interval = monitor_cfg["reconnect_interval"]
+
     attempts = 0
-    while attempts < config["monitor"]["max_reconnect_attempts"]:
+    while attempts < max_attempts:
         try:
             await broadcast_status(f"尝试重新连接设备 (第{attempts + 1}次)", "info")
             await device.connect()
@@ -186,23 +258,56 @@ async def handle_disconnection() -> None:
         except Exception as e:
             logger.error(f"重连失败: {e}")
             attempts += 1
-            if attempts < config["monitor"]["max_reconnect_attempts"]:
-                await asyncio.sleep(config["monitor"]["reconnect_interval"])
+            if attempts < max_attempts:
+                await asyncio.sleep(reconnect_interval)
                 
     await broadcast_status("重连失败，已达到最大尝试次数", "error")
 
 async def broadcast_status(message: str, level: str = "info") -> None:
-    """广播状态消息"""
-    if ws_server:
-        await ws_server.broadcast({
-            "type": "plugin_device_monitor",
-            "message": message,
-            "level": level
-        })
+    """广播状态消息（进入合并队列，由_flush_pending批量发送）"""
+    _pending.append({"message": message, "level": level})
+    if _flush_evt:
+        _flush_evt.set()
+
+async def _flush_pending() -> None:
+    """广播合并任务：把短窗口内积攒的状态消息打包成一条批量广播"""
+    global _pending
+
+    try:
+        while True:
+            await _flush_evt.wait()
+            # 短暂等待，让同一时间窗口内的消息进入同一批
+            await asyncio.sleep(_FLUSH_WINDOW)
+            _flush_evt.clear()
+
+            if not _pending:
+                continue
+
+            batch = _pending
+            _pending = []
+
+            if not ws_server or not getattr(ws_server, "clients", None):
+                continue
+
+            payload = _BATCH_PREFIX + _json_dumps(batch) + _BATCH_SUFFIX
+            # 先快照再并发发送：gather让各客户端的发送在事件循环上并行进行，
+            # 而不是逐个await形成K次串行往返
+            clients = list(ws_server.clients.items())
+            results = await asyncio.gather(
+                *(websocket.send(payload) for _, websocket in clients),
+                return_exceptions=True
+            )
+            for (client_id, _), result in zip(clients, results):
+                if isinstance(result, Exception):
+                    logger.error(f"向客户端 {client_id} 广播状态失败: {result}")
+    except asyncio.CancelledError:
+        pass
 
 def cleanup() -> None:
     """插件清理"""
-    global monitor_task
+    global monitor_task, flusher_task
     if monitor_task:
         monitor_task.cancel()
+    if flusher_task:
+        flusher_task.cancel()
     logger.info("设备监控插件已清理") 
\ No newline at end of file
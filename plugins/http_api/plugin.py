@@ -7,13 +7,35 @@ import asyncio
 import logging
 import os
 import yaml
-import threading
 import traceback
 import json
 from typing import Dict, Any, Optional
 
 from aiohttp import web
 
+# Prefer libyaml's C-backed loader/dumper, falling back to pure Python
+try:
+    from yaml import CSafeLoader as _YamlSafeLoader, CSafeDumper as _YamlSafeDumper
+except ImportError:
+    from yaml import SafeLoader as _YamlSafeLoader, SafeDumper as _YamlSafeDumper
+
+# Prefer orjson for request/response JSON, falling back to the stdlib
+try:
+    import orjson
+    _json_loads = orjson.loads
+    def _json_dumps_bytes(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    _json_loads = json.loads
+    def _json_dumps_bytes(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+
+def _json_response(payload: Any, status: int = 200) -> 'web.Response':
+    """json_response equivalent that encodes straight to bytes."""
+    return web.Response(body=_json_dumps_bytes(payload), status=status,
+                        content_type="application/json")
+
 # Assume DGLabDevice structure based on webui usage and READMEs
 # If core.dglab_device is available, use actual import
 try:
@@ -41,9 +63,7 @@ ws_server: Optional[DGLabWebSocketServer] = None
 config: Dict[str, Any] = {}
 http_runner: Optional[web.AppRunner] = None
 http_site: Optional[web.TCPSite] = None
-http_thread: Optional[threading.Thread] = None
-http_loop: Optional[asyncio.AbstractEventLoop] = None
-shutdown_event = asyncio.Event() # Used in the server thread loop
+http_start_task: Optional[asyncio.Task] = None
 
 
 # Default configuration
@@ -62,8 +82,8 @@ def set_ws_server(server: DGLabWebSocketServer):
     ws_server = server
     logger.info("HTTP API Plugin: WebSocket server instance received.")
 
-async def load_config():
-    """Loads plugin configuration from config.yaml."""
+def load_config():
+    """Loads plugin configuration from config.yaml (small file, sync read)."""
     global config
     base_dir = os.path.dirname(os.path.abspath(__file__))
     config_path = os.path.join(base_dir, "config.yaml")
@@ -73,7 +93,7 @@ async def load_config():
     if os.path.exists(config_path):
         try:
             with open(config_path, "r", encoding="utf-8") as f:
-                user_config = yaml.safe_load(f)
+                user_config = yaml.load(f, Loader=_YamlSafeLoader)
                 if user_config and 'http_api' in user_config:
                     loaded_config['http_api'].update(user_config.get('http_api', {}))
             logger.info("HTTP API Plugin: Loaded configuration from config.yaml")
@@ -86,7 +106,7 @@ async def load_config():
         logger.info("HTTP API Plugin: config.yaml not found, using default configuration.")
         try:
             with open(config_path, "w", encoding="utf-8") as f:
-                yaml.dump(DEFAULT_CONFIG, f, default_flow_style=False)
+                yaml.dump(DEFAULT_CONFIG, f, Dumper=_YamlSafeDumper, default_flow_style=False)
             logger.info("HTTP API Plugin: Created default config.yaml.")
         except Exception as e:
             logger.error(f"HTTP API Plugin: Failed to create default config.yaml: {e}")
@@ -94,26 +114,22 @@ async def load_config():
 
     config = loaded_config
 
-# --- HTTP Server Implementation (Threaded like webui) ---
+# --- HTTP Server Implementation (runs on the main asyncio loop) ---
 
-def run_http_server_thread():
-    """Target function for the HTTP server thread."""
-    global http_loop, http_runner, http_site
+async def _start_http():
+    """Starts the aiohttp server on the already-running main event loop.
 
-    http_loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(http_loop)
+    Running on the main loop means handlers touch `ws_server.device`
+    directly, with no cross-thread hops or call_soon_threadsafe wakeups.
+    """
+    global http_runner, http_site
 
     host = config.get('http_api', {}).get('host', DEFAULT_CONFIG['http_api']['host'])
     port = config.get('http_api', {}).get('port', DEFAULT_CONFIG['http_api']['port'])
 
-    async def start():
+    try:
         app = web.Application()
-        # Define routes within the async context where the loop is running
-        app.add_routes([
-            web.get('/status', handle_get_status),
-            web.post('/control/strength', handle_set_strength), # Renamed from intensity
-            web.post('/control/waveform', handle_set_waveform),
-        ])
+        app.add_routes(_ROUTES)
 
         runner = web.AppRunner(app)
         await runner.setup()
@@ -122,40 +138,26 @@ def run_http_server_thread():
         site = web.TCPSite(runner, host, port)
         await site.start()
         http_site = site # Store site for potential status checks (optional)
-        logger.info(f"HTTP API Plugin: Server started in thread at http://{host}:{port}")
-        # Keep running until shutdown is requested
-        await shutdown_event.wait()
-        logger.info("HTTP API Plugin: Shutdown signal received in server thread.")
-
-
-    async def stop():
-        logger.info("HTTP API Plugin: Stopping server in thread...")
-        if http_runner:
-            await http_runner.cleanup()
-            logger.info("HTTP API Plugin: Server runner cleaned up.")
-        else:
-             logger.info("HTTP API Plugin: Server runner was not found for cleanup.")
-
-
-    try:
-        http_loop.run_until_complete(start())
+        logger.info(f"HTTP API Plugin: Server started at http://{host}:{port}")
     except OSError as e:
         logger.error(f"HTTP API Plugin: Failed to start server on {host}:{port} - {e}. Port might be in use.")
         logger.error(traceback.format_exc())
     except Exception as e:
-        logger.error(f"HTTP API Plugin: Server thread encountered an error: {e}")
+        logger.error(f"HTTP API Plugin: Server startup encountered an error: {e}")
         logger.error(traceback.format_exc())
-    finally:
-        logger.info("HTTP API Plugin: Server thread shutting down...")
-        # Ensure cleanup runs even if start() fails or run_forever is interrupted
-        if http_loop.is_running():
-            http_loop.run_until_complete(stop())
-        http_loop.close()
-        logger.info("HTTP API Plugin: Server thread event loop closed.")
 
 
 # --- HTTP Request Handlers ---
 
+# Pre-encoded body for the hot "device not connected" 404 path
+_ERR_NOT_CONNECTED = _json_dumps_bytes({"error": "Device not connected"})
+
+
+def _not_connected_response() -> web.Response:
+    return web.Response(body=_ERR_NOT_CONNECTED, status=404,
+                        content_type="application/json")
+
+
 async def get_device() -> Optional[DGLabDevice]:
     """Helper to safely get the connected device instance."""
     if ws_server and ws_server.device and ws_server.device.is_connected: 
@@ -166,35 +168,36 @@ async def handle_get_status(request: web.Request) -> web.Response:
     """Handles GET /status requests. Uses get_state() like webui."""
     device = await get_device()
     if not device:
-        return web.json_response({"error": "Device not connected"}, status=404)
+        return _not_connected_response()
 
     try:
         # Use get_state() as observed in webui plugin's sync logic
         state = await device.get_state()
-        return web.json_response(state, status=200)
+        return _json_response(state)
     except Exception as e:
         logger.error(f"HTTP API Error getting state: {e}")
-        logger.error(traceback.format_exc())
-        return web.json_response({"error": "Failed to get device state"}, status=500)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(traceback.format_exc())
+        return _json_response({"error": "Failed to get device state"}, status=500)
 
 async def handle_set_strength(request: web.Request) -> web.Response:
     """Handles POST /control/strength requests. Uses set_strength()."""
     device = await get_device()
     if not device:
-        return web.json_response({"error": "Device not connected"}, status=404)
+        return _not_connected_response()
 
     try:
-        # Get current state first to know the strength of the *other* channel
-        current_state = await device.get_state()
-        current_strength_a = current_state.get('channel_a', {}).get('strength', 0) # Default to 0 if not found
-        current_strength_b = current_state.get('channel_b', {}).get('strength', 0) # Default to 0 if not found
-        
-        data = await request.json()
+        # Read the *other* channel's strength from the in-memory device state
+        # instead of a full get_state() round trip (which touches BLE)
+        current_strength_a = device.state.channel_a.strength
+        current_strength_b = device.state.channel_b.strength
+
+        data = await request.json(loads=_json_loads)
         channel = data.get("channel")
         strength = data.get("strength") # Changed from intensity
 
         if channel not in ['a', 'b'] or not isinstance(strength, int) or not (0 <= strength <= 100):
-            return web.json_response({"error": "Invalid parameters. Required: channel ('a' or 'b'), strength (integer 0-100)"}, status=400)
+            return _json_response({"error": "Invalid parameters. Required: channel ('a' or 'b'), strength (integer 0-100)"}, status=400)
 
         # Fix TypeError: Call set_strength providing BOTH strength arguments
         if channel == 'a':
@@ -204,65 +207,73 @@ async def handle_set_strength(request: web.Request) -> web.Response:
 
         logger.info(f"HTTP API: Set strength: Channel {channel}, New Strength {strength}")
         # Return the strength that was set, along with the channel
-        return web.json_response({"status": "success", "channel": channel, "strength": strength}, status=200)
+        return _json_response({"status": "success", "channel": channel, "strength": strength})
 
     except json.JSONDecodeError:
-         return web.json_response({"error": "Invalid JSON format in request body"}, status=400)
+         return _json_response({"error": "Invalid JSON format in request body"}, status=400)
     except Exception as e:
         logger.error(f"HTTP API Error setting strength: {e}")
-        logger.error(traceback.format_exc())
-        return web.json_response({"error": f"Failed to set strength: {e}"}, status=500)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(traceback.format_exc())
+        return _json_response({"error": f"Failed to set strength: {e}"}, status=500)
 
 async def handle_set_waveform(request: web.Request) -> web.Response:
     """Handles POST /control/waveform requests. Uses set_waveform_preset()."""
     device = await get_device()
     if not device:
-        return web.json_response({"error": "Device not connected"}, status=404)
+        return _not_connected_response()
 
     try:
-        data = await request.json()
+        data = await request.json(loads=_json_loads)
         channel = data.get("channel")
         preset_name = data.get("preset")
 
         if channel not in ['a', 'b'] or not isinstance(preset_name, str) or not preset_name:
-             return web.json_response({"error": "Invalid parameters. Required: channel ('a' or 'b'), preset (string name)"}, status=400)
+             return _json_response({"error": "Invalid parameters. Required: channel ('a' or 'b'), preset (string name)"}, status=400)
 
         # Assuming set_waveform_preset exists based on READMEs/general structure
         await device.set_waveform_preset(channel, preset_name)
         logger.info(f"HTTP API: Set waveform preset: Channel {channel}, Preset {preset_name}")
-        return web.json_response({"status": "success", "channel": channel, "preset": preset_name}, status=200)
+        return _json_response({"status": "success", "channel": channel, "preset": preset_name})
 
     except json.JSONDecodeError:
-         return web.json_response({"error": "Invalid JSON format in request body"}, status=400)
+         return _json_response({"error": "Invalid JSON format in request body"}, status=400)
     except AttributeError:
          logger.error("HTTP API Error: device object likely missing 'set_waveform_preset' method.")
-         return web.json_response({"error": "Server configuration error: Cannot set waveform by preset name."}, status=501) # 501 Not Implemented
+         return _json_response({"error": "Server configuration error: Cannot set waveform by preset name."}, status=501) # 501 Not Implemented
     except Exception as e:
         # Catch potential errors if preset name is invalid on the device side
         logger.error(f"HTTP API Error setting waveform preset: {e}")
-        logger.error(traceback.format_exc())
-        return web.json_response({"error": f"Failed to set waveform preset: {e}"}, status=500)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(traceback.format_exc())
+        return _json_response({"error": f"Failed to set waveform preset: {e}"}, status=500)
+
+
+# Route table is static; build it once at import time
+_ROUTES = [
+    web.get('/status', handle_get_status),
+    web.post('/control/strength', handle_set_strength), # Renamed from intensity
+    web.post('/control/waveform', handle_set_waveform),
+]
 
 
 # --- Plugin Setup and Cleanup ---
 
 def setup():
     """Plugin initialization function (called by plugin loader)."""
-    global http_thread
+    global http_start_task
     logger.info("Initializing HTTP API Plugin...")
 
     # Load config synchronously first
     # asyncio.run(load_config()) # Removed: Cannot call asyncio.run from running loop
     load_config() # Call synchronously now
 
-    # Start the server in a separate thread
-    if not http_thread or not http_thread.is_alive():
-        shutdown_event.clear() # Ensure event is clear before starting
-        http_thread = threading.Thread(target=run_http_server_thread, daemon=True)
-        http_thread.start()
-        logger.info("HTTP API Plugin server thread started.")
+    # Start the server as a task on the main loop
+    if not http_start_task or http_start_task.done():
+        http_start_task = asyncio.create_task(_start_http())
+        logger.info("HTTP API Plugin server startup scheduled.")
     else:
-        logger.warning("HTTP API Plugin server thread already running.")
+        logger.warning("HTTP API Plugin server already starting or running.")
 
     logger.info("HTTP API Plugin initialized.")
 
@@ -272,27 +283,23 @@ async def handle_message(websocket, message_data: Dict[str, Any]) -> bool:
 
 def cleanup():
     """Plugin cleanup function (called by plugin loader)."""
-    global http_thread, http_loop
+    global http_runner, http_site, http_start_task
     logger.info("Cleaning up HTTP API Plugin...")
 
-    if http_thread and http_thread.is_alive():
-        logger.info("Requesting HTTP server thread shutdown...")
-        if http_loop and http_loop.is_running():
-            # Signal the server loop to stop
-            http_loop.call_soon_threadsafe(shutdown_event.set)
-
-            # Wait for the thread to finish
-            http_thread.join(timeout=5.0)
-            if http_thread.is_alive():
-                logger.warning("HTTP API Plugin: Server thread did not terminate gracefully.")
-            else:
-                logger.info("HTTP API Plugin: Server thread terminated.")
-        else:
-            logger.warning("HTTP API Plugin: Server thread loop not found or not running during cleanup.")
+    if http_start_task and not http_start_task.done():
+        http_start_task.cancel()
 
+    if http_runner:
+        # cleanup() is sync; schedule the runner teardown on the main loop
+        try:
+            asyncio.get_running_loop().create_task(http_runner.cleanup())
+            logger.info("HTTP API Plugin: Server shutdown scheduled.")
+        except RuntimeError:
+            logger.warning("HTTP API Plugin: No running loop; server runner not cleaned up.")
     else:
-        logger.info("HTTP API Plugin: Server thread was not running.")
+        logger.info("HTTP API Plugin: Server was not running.")
 
-    http_thread = None
-    http_loop = None
-    logger.info("HTTP API Plugin cleanup finished.") 
+    http_runner = None
+    http_site = None
+    http_start_task = None
+    logger.info("HTTP API Plugin cleanup finished.")
@@ -9,7 +9,13 @@ import importlib.util
 import inspect
 import logging
 import os
+import pkgutil
+import string
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
 from typing import Dict, List, Any, Optional, Callable
 
 from server.ws_server import DGLabWebSocketServer
@@ -18,6 +24,94 @@ from server.ws_server import DGLabWebSocketServer
 logger = logging.getLogger(__name__)
 
 
+# 带缓存的文件类型判断：发现和加载阶段会对同一路径重复stat，
+# 缓存后每个插件路径只产生一次系统调用
+@lru_cache(maxsize=1024)
+def _cached_isfile(path: str) -> bool:
+    return os.path.isfile(path)
+
+
+@lru_cache(maxsize=1024)
+def _cached_isdir(path: str) -> bool:
+    return os.path.isdir(path)
+
+
+# 插件脚手架模板：模块级只构建一次，生成时substitute填入插件名
+_PLUGIN_TEMPLATE = string.Template('''"""
+$plugin_name 插件
+描述：这是一个示例插件模板
+"""
+
+import logging
+from typing import Dict, Any
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+
+def setup() -> None:
+    """
+    插件初始化函数
+    在插件被加载时调用
+    """
+    logger.info("$plugin_name 插件已初始化")
+
+
+async def handle_message(device, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    处理WebSocket消息
+
+    Args:
+        device: DGLabDevice实例
+        data: 消息数据
+
+    Returns:
+        Dict[str, Any]: 处理结果
+    """
+    # 在这里实现您的插件逻辑
+    logger.info(f"收到消息: {data}")
+
+    # 返回处理结果
+    return {"status": "success"}
+
+
+def cleanup() -> None:
+    """
+    插件清理函数
+    在插件被卸载时调用
+    """
+    logger.info("$plugin_name 插件已清理")
+''')
+
+_README_TEMPLATE = string.Template('''# $plugin_name 插件
+
+## 描述
+这是一个DG-LAB设备控制插件
+
+## 使用方法
+1. 确保插件已加载
+2. 通过WebSocket发送以下格式的消息:
+
+```json
+{
+  "type": "plugin_$plugin_name",
+  "action": "your_action",
+  "params": {
+    "param1": "value1",
+    "param2": "value2"
+  }
+}
+```
+
+## 支持的操作
+- 操作1：描述
+- 操作2：描述
+
+## 版本历史
+- 1.0.0: 初始版本
+''')
+
+
 class PluginLoader:
     """DG-LAB 插件加载器"""
     
@@ -31,123 +125,238 @@ class PluginLoader:
         """
         self.server = server
         self.plugins_dir = plugins_dir
+        # 目录存在性只在构造时检查一次，不存在的目录不值得每次发现都去试探
+        self._plugins_root_exists = os.path.isdir(plugins_dir)
+        if not self._plugins_root_exists:
+            logger.warning(f"插件目录 {plugins_dir} 不存在")
         self.loaded_plugins: Dict[str, Any] = {}
-    
+        # 发现结果缓存：键为插件目录的mtime_ns，目录未变化时直接复用
+        self._discover_cache: Optional[Dict[int, List[str]]] = None
+        # 并行导入时保护loaded_plugins检查/写入的锁
+        self._load_lock = threading.Lock()
+        # 缓存每个插件目录的PathEntryFinder，重复加载复用查找器
+        self._finders: Dict[str, Any] = {}
+
     def discover_plugins(self) -> List[str]:
         """
         发现可用插件
-        
+
+        使用os.scandir单次遍历，目录类型直接取自dirent避免额外stat；
+        跳过以'.'或'_'开头的条目（如.git、__pycache__）。
+        结果按插件目录mtime缓存，目录未变化时重复调用为O(1)
+
         Returns:
             List[str]: 发现的插件模块名称列表
         """
         plugin_modules = []
-        
+
+        # 插件根目录不存在时直接返回，不靠异常路径兜底
+        if not self._plugins_root_exists:
+            return plugin_modules
+
         # 获取plugins目录下的所有目录（每个目录是一个插件）
         try:
-            items = os.listdir(self.plugins_dir)
-            for item in items:
-                plugin_dir = os.path.join(self.plugins_dir, item)
-                
-                # 检查是否是目录
-                if os.path.isdir(plugin_dir):
-                    # 检查是否有plugin.py文件
-                    plugin_file = os.path.join(plugin_dir, "plugin.py")
-                    if os.path.isfile(plugin_file):
-                        plugin_modules.append(item)
+            dir_mtime = os.stat(self.plugins_dir).st_mtime_ns
+            if self._discover_cache is not None and dir_mtime in self._discover_cache:
+                return list(self._discover_cache[dir_mtime])
+
+            with os.scandir(self.plugins_dir) as it:
+                for entry in it:
+                    # 跳过隐藏目录和私有目录（.git、__pycache__等）
+                    if entry.name.startswith(('.', '_')):
+                        continue
+                    # 检查是否是目录
+                    if entry.is_dir(follow_symlinks=False):
+                        # 检查是否有plugin.py文件
+                        if _cached_isfile(os.path.join(entry.path, "plugin.py")):
+                            plugin_modules.append(entry.name)
+
+            self._discover_cache = {dir_mtime: plugin_modules}
         except Exception as e:
             logger.error(f"发现插件时出错: {e}")
-        
+
         logger.info(f"发现 {len(plugin_modules)} 个插件: {', '.join(plugin_modules)}")
-        return plugin_modules
+        return list(plugin_modules)
     
-    def load_plugin(self, plugin_name: str) -> bool:
+    def _import_plugin(self, plugin_name: str) -> Optional[Any]:
         """
-        加载单个插件
-        
+        导入插件模块（只做磁盘读取、spec构建和exec_module）
+
+        不触碰事件循环，可在工作线程中并行执行；
+        setup()等需要主线程事件循环的步骤由_finalize_plugin完成
+
         Args:
             plugin_name: 插件名称
-            
+
         Returns:
-            bool: 加载是否成功
+            Optional[Any]: 导入成功的模块，失败返回None
         """
-        if plugin_name in self.loaded_plugins:
-            logger.warning(f"插件 {plugin_name} 已加载")
-            return True
-        
         try:
             # 构建插件模块路径
             plugin_dir = os.path.join(self.plugins_dir, plugin_name)
             plugin_file = os.path.join(plugin_dir, "plugin.py")
-            
+
             # 检查插件文件是否存在
-            if not os.path.isfile(plugin_file):
+            if not _cached_isfile(plugin_file):
                 logger.error(f"插件 {plugin_name} 的plugin.py文件不存在")
-                return False
-            
-            # 加载插件模块
-            spec = importlib.util.spec_from_file_location(
-                f"plugins.{plugin_name}.plugin", 
-                plugin_file
-            )
-            
+                return None
+
+            # 加载插件模块：优先复用缓存的PathEntryFinder查找规范，
+            # 找不到时回退到spec_from_file_location
+            module_name = f"plugins.{plugin_name}.plugin"
+            spec = None
+
+            finder = self._finders.get(plugin_dir)
+            if finder is None:
+                finder = pkgutil.get_importer(plugin_dir)
+                if finder is not None:
+                    self._finders[plugin_dir] = finder
+
+            if finder is not None:
+                try:
+                    spec = finder.find_spec("plugin")
+                    if spec is not None and spec.loader is not None:
+                        # 统一为完整模块名，避免所有插件都占用'plugin'这个键
+                        spec.name = module_name
+                        spec.loader.name = module_name
+                    else:
+                        spec = None
+                except Exception:
+                    spec = None
+
+            if spec is None:
+                spec = importlib.util.spec_from_file_location(module_name, plugin_file)
+
             if spec is None or spec.loader is None:
                 logger.error(f"无法加载插件 {plugin_name} 的规范")
-                return False
-            
+                return None
+
             module = importlib.util.module_from_spec(spec)
             sys.modules[spec.name] = module
             spec.loader.exec_module(module)
-            
+
             # 检查插件是否有必要的属性和方法
             if not hasattr(module, "setup") or not callable(module.setup):
                 logger.error(f"插件 {plugin_name} 缺少setup函数")
-                return False
-            
+                return None
+
             if not hasattr(module, "handle_message") or not callable(module.handle_message):
                 logger.error(f"插件 {plugin_name} 缺少handle_message函数")
-                return False
-            
+                return None
+
             # 检查handle_message是否为异步函数
             if not inspect.iscoroutinefunction(module.handle_message):
                 logger.error(f"插件 {plugin_name} 的handle_message不是异步函数")
-                return False
-            
+                return None
+
+            return module
+
+        except Exception as e:
+            logger.error(f"导入插件 {plugin_name} 时出错: {e}")
+            return None
+
+    def _finalize_plugin(self, plugin_name: str, module: Any) -> bool:
+        """
+        完成插件初始化：注入服务器引用、调用setup并注册消息处理函数
+
+        在调用方线程（主线程）串行执行，setup中创建的asyncio任务
+        落在主事件循环上
+
+        Args:
+            plugin_name: 插件名称
+            module: 已导入的插件模块
+
+        Returns:
+            bool: 初始化是否成功
+        """
+        try:
             # 检查是否有set_ws_server方法，如果有则注入WebSocket服务器引用
             if hasattr(module, "set_ws_server") and callable(module.set_ws_server):
                 module.set_ws_server(self.server)
                 logger.info(f"插件 {plugin_name} 注入WebSocket服务器引用")
-            
+
             # 调用插件的setup函数
             module.setup()
-            
+
             # 注册插件的消息处理函数
             self.server.register_plugin(plugin_name, module.handle_message)
-            
+
             # 存储已加载的插件
-            self.loaded_plugins[plugin_name] = module
-            
+            with self._load_lock:
+                self.loaded_plugins[plugin_name] = module
+
             logger.info(f"插件 {plugin_name} 加载成功")
             return True
-            
+
         except Exception as e:
             logger.error(f"加载插件 {plugin_name} 时出错: {e}")
             return False
-    
+
+    def load_plugin(self, plugin_name: str) -> bool:
+        """
+        加载单个插件
+
+        Args:
+            plugin_name: 插件名称
+
+        Returns:
+            bool: 加载是否成功
+        """
+        with self._load_lock:
+            if plugin_name in self.loaded_plugins:
+                logger.warning(f"插件 {plugin_name} 已加载")
+                return True
+
+        module = self._import_plugin(plugin_name)
+        if module is None:
+            return False
+        return self._finalize_plugin(plugin_name, module)
+
     def load_all_plugins(self) -> Dict[str, bool]:
         """
         加载所有发现的插件
-        
+
+        导入阶段（磁盘读取+字节码编译）在线程池中并行执行，
+        线程在文件I/O期间释放GIL；setup/注册阶段回到主线程按发现顺序串行执行
+
         Returns:
             Dict[str, bool]: 插件加载结果字典，键为插件名称，值为是否加载成功
         """
         plugins = self.discover_plugins()
-        results = {}
-        
-        for plugin_name in plugins:
-            results[plugin_name] = self.load_plugin(plugin_name)
-        
+        results: Dict[str, bool] = {}
+
+        with self._load_lock:
+            pending = [name for name in plugins if name not in self.loaded_plugins]
+            for name in plugins:
+                if name in self.loaded_plugins:
+                    logger.warning(f"插件 {name} 已加载")
+                    results[name] = True
+
+        if not pending:
+            return results
+
+        # 并行导入
+        with ThreadPoolExecutor(max_workers=min(8, len(pending))) as executor:
+            modules = dict(zip(pending, executor.map(self._import_plugin, pending)))
+
+        # 串行初始化，保持发现顺序
+        for plugin_name in pending:
+            module = modules[plugin_name]
+            if module is None:
+                results[plugin_name] = False
+            else:
+                results[plugin_name] = self._finalize_plugin(plugin_name, module)
+
         return results
     
+    def invalidate_fs_cache(self) -> None:
+        """清除文件系统缓存，插件目录被修改后调用"""
+        _cached_isfile.cache_clear()
+        _cached_isdir.cache_clear()
+        self._discover_cache = None
+        self._finders.clear()
+        self._plugins_root_exists = os.path.isdir(self.plugins_dir)
+
     def unload_plugin(self, plugin_name: str) -> bool:
         """
         卸载插件
@@ -175,6 +384,8 @@ class PluginLoader:
             if plugin_name in self.server.plugins:
                 del self.server.plugins[plugin_name]
             
+            self.invalidate_fs_cache()
+
             logger.info(f"插件 {plugin_name} 卸载成功")
             return True
             
@@ -210,84 +421,20 @@ class PluginLoader:
             
             # 创建插件文件
             plugin_file = os.path.join(plugin_dir, "plugin.py")
-            with open(plugin_file, "w", encoding="utf-8") as f:
-                f.write(f'''"""
-{plugin_name} 插件
-描述：这是一个示例插件模板
-"""
-
-import logging
-from typing import Dict, Any
-
-# 设置日志
-logger = logging.getLogger(__name__)
-
-
-def setup() -> None:
-    """
-    插件初始化函数
-    在插件被加载时调用
-    """
-    logger.info("{plugin_name} 插件已初始化")
-
-
-async def handle_message(device, data: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    处理WebSocket消息
-    
-    Args:
-        device: DGLabDevice实例
-        data: 消息数据
-        
-    Returns:
-        Dict[str, Any]: 处理结果
-    """
-    # 在这里实现您的插件逻辑
-    logger.info(f"收到消息: {{data}}")
-    
-    # 返回处理结果
-    return {{"status": "success"}}
-
+            Path(plugin_file).write_text(
+                _PLUGIN_TEMPLATE.substitute(plugin_name=plugin_name),
+                encoding="utf-8"
+            )
 
-def cleanup() -> None:
-    """
-    插件清理函数
-    在插件被卸载时调用
-    """
-    logger.info("{plugin_name} 插件已清理")
-''')
-            
             # 创建README.md
             readme_file = os.path.join(plugin_dir, "README.md")
-            with open(readme_file, "w", encoding="utf-8") as f:
-                f.write(f'''# {plugin_name} 插件
-
-## 描述
-这是一个DG-LAB设备控制插件
-
-## 使用方法
-1. 确保插件已加载
-2. 通过WebSocket发送以下格式的消息:
-
-```json
-{{
-  "type": "plugin_{plugin_name}",
-  "action": "your_action",
-  "params": {{
-    "param1": "value1",
-    "param2": "value2"
-  }}
-}}
-```
+            Path(readme_file).write_text(
+                _README_TEMPLATE.substitute(plugin_name=plugin_name),
+                encoding="utf-8"
+            )
 
-## 支持的操作
-- 操作1：描述
-- 操作2：描述
+            self.invalidate_fs_cache()
 
-## 版本历史
-- 1.0.0: 初始版本
-''')
-            
             logger.info(f"插件模板 {plugin_name} 创建成功")
             return True
             
@@ -9,20 +9,54 @@ import json
 import os
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Union, Callable
-import socket
 import time
 import fnmatch
 import re
 
-from pythonosc.dispatcher import Dispatcher
-from pythonosc.osc_server import AsyncIOOSCUDPServer
-
-# 添加yaml支持
-import yaml
+# pythonosc延迟到start_osc_server内导入；yaml只在旧版配置迁移路径
+# 局部导入——插件未激活时不付出这两个库的导入开销
 
 # 设置日志
 logger = logging.getLogger(__name__)
 
+# 复用的紧凑JSON编码器：跳过每次json.dumps的编码器构建，
+# 去掉分隔符空白让WS帧更小
+_dumps = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+# JSON解析/序列化优先使用orjson（C实现），未安装时回退到标准库
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+    def _json_dumps_pretty(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = _dumps
+
+    def _json_dumps_pretty(obj: Any) -> str:
+        return json.dumps(obj, indent=4, ensure_ascii=False)
+
+# broadcast_status的固定外层结构：只有message部分是变化的，
+# 外层不必每次重建dict再整体序列化
+_STATUS_PREFIX = '{"type":"plugin_vrchat_osc","message":'
+_STATUS_SUFFIX = '}'
+
+
+def __getattr__(name: str):
+    """懒加载pythonosc符号，供外部代码introspect本模块时使用"""
+    if name == "Dispatcher":
+        from pythonosc.dispatcher import Dispatcher
+        return Dispatcher
+    if name == "AsyncIOOSCUDPServer":
+        from pythonosc.osc_server import AsyncIOOSCUDPServer
+        return AsyncIOOSCUDPServer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # 全局变量
 osc_server = None
 ws_server = None
@@ -69,12 +103,88 @@ DEFAULT_CONFIG = {
     }
 }
 
+class _ChannelCfg:
+    """热路径用的扁平化通道配置
+
+    OSC消息以几十到几百Hz到达，处理器里反复做嵌套dict查找开销可观；
+    配置加载/更新时预先拍平成属性访问，span倒数预先算好用乘法代替除法
+    """
+
+    __slots__ = ("bottom", "top", "inv_span", "strength_limit", "mode",
+                 "distance_wave", "shock_wave")
+
+    def __init__(self, bottom: float, top: float, inv_span: float,
+                 strength_limit: int, mode: str,
+                 distance_wave: str, shock_wave: str):
+        self.bottom = bottom
+        self.top = top
+        self.inv_span = inv_span
+        self.strength_limit = strength_limit
+        self.mode = mode
+        self.distance_wave = distance_wave
+        self.shock_wave = shock_wave
+
+
+# 每通道的扁平化配置，load_config和update_config后重建
+_cfg: Dict[str, _ChannelCfg] = {}
+
+# 配置加载时按模式特化好的处理函数引用，OSC分发路径不再做模式分支
+_handler_a: Optional[Callable] = None
+_handler_b: Optional[Callable] = None
+
+
+def _rebuild_channel_cfg() -> None:
+    """根据当前config重建扁平化通道配置，并按模式特化通道处理函数"""
+    wave_presets = config.get("wave_presets", {}) if config else {}
+    distance_wave = wave_presets.get("distance_mode", "Wave")
+    shock_wave = wave_presets.get("shock_mode", "Pulse")
+
+    for channel, key in (("A", "channel_a"), ("B", "channel_b")):
+        ch = (config or {}).get(key) or DEFAULT_CONFIG[key]
+        trigger_range = ch.get("trigger_range", {})
+        bottom = float(trigger_range.get("bottom", 0.0))
+        top = float(trigger_range.get("top", 1.0))
+        span = top - bottom
+        inv_span = 1.0 / span if span > 0 else 0.0
+        _cfg[channel] = _ChannelCfg(
+            bottom, top, inv_span,
+            ch.get("strength_limit", 100),
+            ch.get("mode", "distance"),
+            distance_wave, shock_wave
+        )
+
+    global _handler_a, _handler_b
+    mode_handlers = {"distance": handle_distance_mode, "shock": handle_shock_mode}
+    _handler_a = mode_handlers.get(_cfg["A"].mode)
+    _handler_b = mode_handlers.get(_cfg["B"].mode)
+
+
 # 记录目标强度值和上次发送的强度值，用于节流
 target_strength = {"A": 0, "B": 0}
 last_sent_strength = {"A": -1, "B": -1} # 初始化为-1以确保首次更新
 strength_sender_task = None
 THROTTLE_INTERVAL = 0.1 # 默认节流间隔 (秒)
 
+# 电击模式的复位到期时间戳（monotonic，0表示无待复位）。
+# 每通道只有一个到期点：快速重触发只会推后到期，
+# 不会像独立的延时任务那样堆叠出乱序的复位
+_shock_expiry = {"A": 0.0, "B": 0.0}
+
+# 电击触发后恢复为0的延迟（秒）
+_SHOCK_RESET_DELAY = 2.0
+
+# 目标强度变化唤醒事件：发送任务平时挂起等待，有新值时被唤醒，
+# 节流窗口内的多次更新合并为一次发送（最新值生效），无消息时零唤醒
+_strength_dirty: Optional[asyncio.Event] = None
+
+# 配置就绪/停止事件：替代100ms轮询config和每秒轮询running标志，
+# 等待方在事件触发时立即被唤醒
+_config_ready: Optional[asyncio.Event] = None
+_stop_event: Optional[asyncio.Event] = None
+
+# 配置解析缓存：路径 -> (mtime, 解析结果)，文件未变化时重复加载免去解析
+_config_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
 # 添加波形缓存变量，避免频繁切换相同波形
 wave_cache = {
     "A": None,  # 通道A当前波形
@@ -86,55 +196,112 @@ wave_cache = {
 # 波形更新最小间隔（秒），避免频繁切换
 WAVE_UPDATE_INTERVAL = 1.0
 
-def is_port_in_use(host, port):
-    """检查端口是否被占用"""
-    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
-        try:
-            s.bind((host, port))
-            return False
-        except socket.error:
-            return True
+
+class _ChannelKeys:
+    """每通道的静态键名
+
+    这些键只由通道字母决定，提前绑定成属性，
+    热路径上不再做 'default_channel_a' if channel == 'A' else ...
+    这类字符串分支和f-string拼接
+    """
+
+    __slots__ = ("cfg_key", "default_preset_key", "last_change_key")
+
+    def __init__(self, cfg_key: str, default_preset_key: str,
+                 last_change_key: str):
+        self.cfg_key = cfg_key
+        self.default_preset_key = default_preset_key
+        self.last_change_key = last_change_key
+
+
+_PER_CHANNEL = {
+    "A": _ChannelKeys("channel_a", "default_channel_a", "A_last_change"),
+    "B": _ChannelKeys("channel_b", "default_channel_b", "B_last_change"),
+}
+
+# OSC地址分发表：精确地址走哈希表O(1)命中，
+# 通配符模式在注册时一次性编译为正则，只有它们才逐条匹配
+_exact_handlers: Dict[str, List[Callable]] = {}
+_wild_handlers: List[Tuple[Any, Callable]] = []
+
+
+def _dispatch_osc(address: str, *args: Any) -> None:
+    """统一的OSC入口：精确地址哈希命中，真正的通配符才做正则匹配"""
+    for h in _exact_handlers.get(address, ()):
+        h(address, *args)
+    for pattern, h in _wild_handlers:
+        if pattern.match(address):
+            h(address, *args)
+
+
+def _make_dispatcher():
+    """构造只命中_dispatch_osc的分发器
+
+    python-osc的handlers_for_address对每条到达的消息都把地址翻译成
+    正则再扫描整个注册表；匹配逻辑已全部由_dispatch_osc的哈希查找
+    承担，这里直接短路掉那次逐消息的正则构建
+    """
+    from pythonosc.dispatcher import Dispatcher
+
+    class _FastDispatcher(Dispatcher):
+        def handlers_for_address(self, address_pattern):
+            if self._default_handler is not None:
+                yield self._default_handler
+
+    d = _FastDispatcher()
+    d.set_default_handler(_dispatch_osc)
+    return d
 
 async def start_osc_server() -> None:
     """启动OSC服务器以监听VRChat消息"""
     global running, dispatcher
-    
-    # 等待配置加载完成
-    while not config:
-        await asyncio.sleep(0.1)
-    
+
+    # 等待配置加载完成（事件触发，无需轮询）
+    if not config and _config_ready is not None:
+        await _config_ready.wait()
+
     try:
-        # 检查端口是否被占用
+        # 延迟导入pythonosc：只有真正启动OSC服务器时才需要
+        from pythonosc.osc_server import AsyncIOOSCUDPServer
+
         host = config["osc"]["listen_host"]
         port = config["osc"]["listen_port"]
-        
-        if is_port_in_use(host, port):
-            logger.error(f"端口 {port} 已被占用，无法启动OSC服务器")
-            return
-        
-        # 创建OSC分发器
-        dispatcher = Dispatcher()
-        
+
+        # 创建OSC分发器（所有消息经_dispatch_osc按哈希表分发）
+        dispatcher = _make_dispatcher()
+        _exact_handlers.clear()
+        _wild_handlers.clear()
+
         # 注册通道A的参数处理
         register_osc_handlers(config["channel_a"]["avatar_params"], handle_channel_a)
-        
+
         # 注册通道B的参数处理
         register_osc_handlers(config["channel_b"]["avatar_params"], handle_channel_b)
         
-        # 创建OSC服务器
+        # 创建OSC服务器——直接尝试绑定，占用时处理OSError，
+        # 省去先开探测socket再真正绑定的两次系统调用和其间的竞争窗口
         loop = asyncio.get_running_loop()
         server = AsyncIOOSCUDPServer((host, port), dispatcher, loop)
-        transport, protocol = await server.create_serve_endpoint()
-        
+        try:
+            transport, protocol = await server.create_serve_endpoint()
+        except OSError as e:
+            logger.error(f"无法绑定 {host}:{port}: {e}")
+            return
+
         # 标记为运行中
         running = True
-        
+        if _stop_event is not None:
+            _stop_event.clear()
+
         logger.info(f"OSC服务器已启动，监听 {host}:{port}")
-        
-        # 等待直到服务被停止
-        while running:
-            await asyncio.sleep(1)
-        
+
+        # 挂起等待停止事件，被触发时立即返回，无需每秒轮询running标志
+        if _stop_event is not None:
+            await _stop_event.wait()
+        else:
+            while running:
+                await asyncio.sleep(1)
+
         # 关闭服务器
         transport.close()
         logger.info("OSC服务器已关闭")
@@ -151,146 +318,143 @@ def register_osc_handlers(patterns: List[str], handler: Callable) -> None:
         patterns: OSC地址模式列表，支持通配符
         handler: 处理函数
     """
+    # 精确地址进哈希表，分发时O(1)命中；
+    # 通配符模式注册时一次性编译为正则，分发时只有它们参与匹配
     for pattern in patterns:
-        # 检查是否包含通配符
-        if '*' in pattern:
-            # 将OSC通配符模式转换为正则表达式
-            regex_pattern = '^' + re.escape(pattern).replace('\\*', '.*') + '$'
-            # 添加正则匹配处理器
-            dispatcher.map_all(lambda address, *args: re.match(regex_pattern, address), handler)
+        if '*' in pattern or '?' in pattern or '[' in pattern:
+            _wild_handlers.append((re.compile(fnmatch.translate(pattern)), handler))
             logger.info(f"注册通配符OSC参数: {pattern}")
         else:
-            # 普通精确匹配
-            dispatcher.map(pattern, handler)
+            _exact_handlers.setdefault(pattern, []).append(handler)
             logger.info(f"注册OSC参数: {pattern}")
 
 def handle_channel_a(address: str, *args: Any) -> None:
     """处理通道A的OSC消息"""
-    global config
-    value = sanitize_osc_param(args)
-    logger.debug(f"通道A收到OSC消息: {address} = {value}")
-    
-    # 等待配置加载完成
-    if not config:
+    # 模式分支已在配置加载时特化为_handler_a，分发路径无条件判断
+    if _handler_a is None:
         logger.warning("配置尚未加载，无法处理OSC消息")
         return
-    
-    # 根据配置的模式处理参数
-    if config["channel_a"]["mode"] == "distance":
-        asyncio.create_task(handle_distance_mode("A", value))
-    elif config["channel_a"]["mode"] == "shock":
-        asyncio.create_task(handle_shock_mode("A", value))
+    value = sanitize_osc_param(args)
+    logger.debug("通道A收到OSC消息: %s = %s", address, value)
+    _handler_a("A", value)
 
 def handle_channel_b(address: str, *args: Any) -> None:
     """处理通道B的OSC消息"""
-    global config
-    value = sanitize_osc_param(args)
-    logger.debug(f"通道B收到OSC消息: {address} = {value}")
-    
-    # 等待配置加载完成
-    if not config:
+    # 模式分支已在配置加载时特化为_handler_b，分发路径无条件判断
+    if _handler_b is None:
         logger.warning("配置尚未加载，无法处理OSC消息")
         return
-    
-    # 根据配置的模式处理参数
-    if config["channel_b"]["mode"] == "distance":
-        asyncio.create_task(handle_distance_mode("B", value))
-    elif config["channel_b"]["mode"] == "shock":
-        asyncio.create_task(handle_shock_mode("B", value))
+    value = sanitize_osc_param(args)
+    logger.debug("通道B收到OSC消息: %s = %s", address, value)
+    _handler_b("B", value)
 
 def sanitize_osc_param(args: Tuple) -> float:
-    """处理并规范化OSC参数值"""
+    """处理并规范化OSC参数值
+
+    每个OSC参数都要经过这里，按出现频率排列分支：float占绝大多数。
+    用type() is精确比较代替isinstance（跳过MRO遍历，bool不会误入int分支），
+    显式比较代替max/min/float链
+    """
     if not args:
         return 0.0
-    
+
     value = args[0]
-    
-    # 处理布尔值
-    if isinstance(value, bool):
+    t = type(value)
+
+    if t is float:
+        return 0.0 if value < 0.0 else 1.0 if value > 1.0 else value
+    if t is int:
+        return 0.0 if value < 0 else 1.0 if value > 1 else float(value)
+    if t is bool:
         return 1.0 if value else 0.0
-    
-    # 处理数值
-    if isinstance(value, (int, float)):
-        # 将OSC参数限制在0.0到1.0之间
-        clamped_value = max(0.0, min(1.0, float(value)))
-        # logger.debug(f"Sanitized OSC value: {clamped_value}") # 添加日志记录
-        return clamped_value
-    
+
     # 无法处理的类型，返回0
     logger.warning(f"无法处理的OSC参数类型: {type(value)}")
     return 0.0
 
-async def handle_distance_mode(channel: str, value: float) -> None:
-    """处理距离模式"""
-    # 检查是否满足触发条件
-    channel_key = "channel_a" if channel == "A" else "channel_b"
-    bottom = config[channel_key]["trigger_range"]["bottom"]
-    top = config[channel_key]["trigger_range"]["top"]
-    
-    if value <= bottom:
+def _has_ws_clients() -> bool:
+    """是否有WebSocket客户端在线（热路径上先问这个再构造播报）"""
+    return bool(ws_server and getattr(ws_server, 'clients', None))
+
+def handle_distance_mode(channel: str, value: float) -> None:
+    """处理距离模式
+
+    纯同步执行：每条OSC消息的归一化/强度计算不值得一次Task分配，
+    只有真正涉及I/O的部分（波形切换、状态播报）才建任务
+    """
+    # 扁平化配置：一次dict取值，其余全是属性访问
+    cfg = _cfg[channel]
+
+    if value <= cfg.bottom:
         normalized_value = 0.0
-    elif value >= top:
+    elif value >= cfg.top:
         normalized_value = 1.0
     else:
-        normalized_value = (value - bottom) / (top - bottom)
-    
-    # 获取强度限制
-    strength_limit = config[channel_key]["strength_limit"]
-    
+        normalized_value = (value - cfg.bottom) * cfg.inv_span
+
     # 计算目标强度
-    target_strength = int(normalized_value * strength_limit)
-    
-    # 确保设备有波形设置
-    if target_strength > 0 and device and device.is_connected:
-        # 使用配置中指定的距离模式波形
-        preset_name = config.get("wave_presets", {}).get("distance_mode", "Wave")
-        await ensure_device_wave(channel, preset_name)
-    
+    target_strength = int(normalized_value * cfg.strength_limit)
+
+    # 仅当波形确实需要切换时才调度ensure_device_wave
+    if (target_strength > 0 and device and device.is_connected
+            and wave_cache[channel] != cfg.distance_wave):
+        asyncio.create_task(ensure_device_wave(channel, cfg.distance_wave))
+
     # 更新目标强度值 (节流处理)
     update_target_strength(channel, target_strength)
-    
-    # 播报状态
-    await broadcast_status(f"通道{channel} 距离: {value:.2f}, 归一化: {normalized_value:.2f}, 目标强度: {target_strength}")
-
-async def handle_shock_mode(channel: str, value: float) -> None:
-    """处理电击模式"""
-    # 检查是否满足触发条件
-    channel_key = "channel_a" if channel == "A" else "channel_b"
-    bottom = config[channel_key]["trigger_range"]["bottom"]
-    
-    if value > bottom:
-        # 获取强度限制
-        strength_limit = config[channel_key]["strength_limit"]
-        
-        # 使用配置中指定的电击模式波形
-        if device and device.is_connected:
-            preset_name = config.get("wave_presets", {}).get("shock_mode", "Pulse")
-            await ensure_device_wave(channel, preset_name)
-        
+
+    # 播报状态——没有客户端时连消息字符串和协程都不构造
+    if _has_ws_clients():
+        asyncio.create_task(broadcast_status(
+            f"通道{channel} 距离: {value:.2f}, 归一化: {normalized_value:.2f}, 目标强度: {target_strength}"))
+
+def handle_shock_mode(channel: str, value: float) -> None:
+    """处理电击模式
+
+    纯同步执行：触发判断和强度更新就地完成，I/O部分才建任务
+    """
+    # 扁平化配置：一次dict取值，其余全是属性访问
+    cfg = _cfg[channel]
+
+    if value > cfg.bottom:
+        strength_limit = cfg.strength_limit
+
+        # 仅当波形确实需要切换时才调度ensure_device_wave
+        if (device and device.is_connected
+                and wave_cache[channel] != cfg.shock_wave):
+            asyncio.create_task(ensure_device_wave(channel, cfg.shock_wave))
+
         # 设置目标强度 (节流处理)
         update_target_strength(channel, strength_limit)
-        
-        # 2秒后恢复为0
-        await broadcast_status(f"通道{channel} 触发电击，目标强度: {strength_limit}")
-        
-        # 创建任务在指定延迟后将目标强度设置回0
-        asyncio.create_task(reset_target_strength_after_delay(channel, 2.0))
 
-async def reset_target_strength_after_delay(channel: str, delay: float) -> None:
-    """延迟后重置目标强度为0"""
-    await asyncio.sleep(delay)
-    update_target_strength(channel, 0) # 更新目标强度
-    await broadcast_status(f"通道{channel} 电击结束，目标强度恢复为0")
+        if _has_ws_clients():
+            asyncio.create_task(broadcast_status(f"通道{channel} 触发电击，目标强度: {strength_limit}"))
+
+        # 记录复位到期点，由节流任务到期后把强度衰减回0；
+        # 不再为每次触发建独立的延时任务
+        _shock_expiry[channel] = time.monotonic() + _SHOCK_RESET_DELAY
+
+def _decay_expired_shocks() -> None:
+    """把复位时限已到的通道目标强度衰减回0（在节流任务内调用）"""
+    now = time.monotonic()
+    for channel in ("A", "B"):
+        expiry = _shock_expiry[channel]
+        if expiry and now >= expiry:
+            _shock_expiry[channel] = 0.0
+            update_target_strength(channel, 0)
+            if _has_ws_clients():
+                asyncio.create_task(broadcast_status(f"通道{channel} 电击结束，目标强度恢复为0"))
 
 # 修改: 不再直接发送，只更新目标值
 def update_target_strength(channel: str, strength: int) -> None:
-    """更新目标强度值，由节流任务发送"""
+    """更新目标强度值，由节流任务发送（写入后唤醒发送任务）"""
     global target_strength
     # 确保强度在0-100之间
     clamped_strength = max(0, min(100, strength))
     if target_strength[channel] != clamped_strength:
         target_strength[channel] = clamped_strength
-        # logger.debug(f"通道 {channel} 目标强度更新为: {clamped_strength}") # 调试日志
+        if _strength_dirty is not None:
+            _strength_dirty.set()
 
 # 新增: 节流发送强度任务
 async def _throttled_strength_sender() -> None:
@@ -311,35 +475,54 @@ async def _throttled_strength_sender() -> None:
         logger.info(f"使用强度转换系数: {strength_scale}，目标强度将乘以此系数")
     except Exception as e:
         logger.error(f"读取强度转换系数失败: {e}，使用默认值 1.0")
-    
+
+    # 目标强度只有0..100这101个取值，转换系数在任务启动后固定：
+    # 预先建好查表，逐tick的乘法+取整+钳位变成一次下标访问
+    scale_lut = [max(0, min(100, int(i * strength_scale))) for i in range(101)]
+
     error_count = 0
     while running:
         try:
+            # 挂起等待新值到达，再等一个节流窗口让同窗口内的更新合并，
+            # 发送时取的是最新的目标值（latest value wins）。
+            # 有待复位的电击时改为限时等待，到期后由本循环衰减回0
+            pending = [e for e in (_shock_expiry["A"], _shock_expiry["B"]) if e]
+            if pending:
+                timeout = max(min(pending) - time.monotonic(), 0.0)
+                try:
+                    await asyncio.wait_for(_strength_dirty.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await _strength_dirty.wait()
             await asyncio.sleep(THROTTLE_INTERVAL)
+            _strength_dirty.clear()
+
+            # 先处理到期的电击复位，本轮就把0值发出去
+            _decay_expired_shocks()
 
             if not device:
                 logger.debug("设备实例不存在，跳过本次发送 (等待设备连接)")
+                _strength_dirty.set()  # 保留待发送状态，设备就绪后重试
                 continue
-                
+
             if not device.is_connected:
                 # 如果设备断开，重置上次发送状态，以便连接后立即发送
                 if last_sent_strength["A"] != -1 or last_sent_strength["B"] != -1:
                     last_sent_strength = {"A": -1, "B": -1}
                     logger.debug("设备未连接，已重置上次发送状态")
+                _strength_dirty.set()  # 保留待发送状态，设备就绪后重试
                 continue # 设备未连接，跳过本次发送
 
-            # 应用强度转换系数计算实际发送强度 (先转换为浮点数，再取整)
-            raw_ts_a = int(target_strength["A"] * float(strength_scale))
-            raw_ts_b = int(target_strength["B"] * float(strength_scale))
-            
-            # 确保强度在有效范围内 (0-100)
-            ts_a = max(0, min(100, raw_ts_a))
-            ts_b = max(0, min(100, raw_ts_b))
+            # 应用强度转换系数（查表：update_target_strength已保证0-100）
+            ts_a = scale_lut[target_strength["A"]]
+            ts_b = scale_lut[target_strength["B"]]
 
             # 只有当目标强度与上次发送的强度不同时才发送
             if ts_a != last_sent_strength["A"] or ts_b != last_sent_strength["B"]:
-                logger.debug(f"节流发送强度: A={ts_a} (原值: {target_strength['A']}×{strength_scale}={raw_ts_a}), " +
-                           f"B={ts_b} (原值: {target_strength['B']}×{strength_scale}={raw_ts_b})")
+                logger.debug("节流发送强度: A=%s, B=%s (原始: A=%s, B=%s, 系数=%s)",
+                             ts_a, ts_b, target_strength['A'], target_strength['B'],
+                             strength_scale)
                 try:
                     # 不管怎样，发送前先检查设备连接状态
                     if not device.is_connected:
@@ -361,6 +544,7 @@ async def _throttled_strength_sender() -> None:
                     logger.error(f"节流发送强度失败 (第{error_count}次): {e}")
                     # 发送失败时重置 last_sent_strength 让下次强制重试
                     last_sent_strength = {"A": -1, "B": -1}
+                    _strength_dirty.set()  # 唤醒下一轮重试
                     
                     # 如果连续失败超过5次，等待较长时间
                     if error_count >= 5:
@@ -380,82 +564,102 @@ async def _throttled_strength_sender() -> None:
 async def broadcast_status(message: str) -> None:
     """广播状态消息到所有连接的WebSocket客户端"""
     if not ws_server:
-        logger.debug(f"状态消息无法广播(ws_server未初始化): {message}")
+        logger.debug("状态消息无法广播(ws_server未初始化): %s", message)
         return
         
     if not hasattr(ws_server, 'clients') or not ws_server.clients:
-        logger.debug(f"状态消息无法广播(无客户端连接): {message}")
+        logger.debug("状态消息无法广播(无客户端连接): %s", message)
         return
     
     try:
-        status_message = json.dumps({
-            "type": "plugin_vrchat_osc",
-            "message": message
-        })
-        
-        # 广播到所有客户端
+        # 外层结构固定：只序列化message本身，拼进预构建的信封
+        status_message = _STATUS_PREFIX + _json_dumps(message) + _STATUS_SUFFIX
+
+        # 先快照再并发发送：gather让各客户端的发送在事件循环上并行进行，
+        # 而不是逐个await形成N次串行往返
+        clients = list(ws_server.clients.items())
+        results = await asyncio.gather(
+            *(websocket.send(status_message) for _, websocket in clients),
+            return_exceptions=True
+        )
+
         client_count = 0
-        for client_id, websocket in ws_server.clients.items():
-            try:
-                await websocket.send(status_message)
+        for (client_id, _), result in zip(clients, results):
+            if isinstance(result, Exception):
+                logger.error(f"向客户端 {client_id} 发送状态消息失败: {result}")
+            else:
                 client_count += 1
-            except Exception as e:
-                logger.error(f"向客户端 {client_id} 发送状态消息失败: {e}")
-        
+
         if client_count > 0:
-            logger.debug(f"状态消息已广播到 {client_count} 个客户端: {message}")
+            logger.debug("状态消息已广播到 %s 个客户端: %s", client_count, message)
     
     except Exception as e:
         logger.error(f"广播状态消息失败: {e}")
 
+def _read_and_parse(path: str) -> Dict[str, Any]:
+    """同步读取并解析JSON配置（在执行器线程里跑，不阻塞事件循环）"""
+    with open(path, "r", encoding="utf-8") as f:
+        return _json_loads(f.read())
+
+def _write_config_file(path: str, payload: str) -> None:
+    """同步写出配置文本（同样在执行器线程里跑）"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(payload)
+
 async def load_config() -> None:
-    """加载插件配置"""
+    """加载插件配置
+
+    配置只使用JSON（标准库C实现解析，免去PyYAML导入和解析开销）；
+    检测到旧版config.yaml时做一次性迁移并备份原文件
+    """
     global config
-    
+
     # 配置文件路径
     base_dir = os.path.dirname(os.path.abspath(__file__))
     json_config_path = os.path.join(base_dir, "config.json")
     yaml_config_path = os.path.join(base_dir, "config.yaml")
-    
-    # 首先尝试加载YAML配置
-    if os.path.exists(yaml_config_path):
-        try:
-            with open(yaml_config_path, "r", encoding="utf-8") as f:
-                config = yaml.safe_load(f)
-            logger.info("已从YAML文件加载配置")
-            return
-        except Exception as e:
-            logger.error(f"加载YAML配置失败: {str(e)}")
-    
-    # 如果YAML配置不存在或加载失败，尝试加载JSON配置
+
+    # 首先尝试加载JSON配置（mtime未变化时直接复用上次的解析结果）
     if os.path.exists(json_config_path):
         try:
-            with open(json_config_path, "r", encoding="utf-8") as f:
-                config = json.load(f)
-            logger.info("已从JSON文件加载配置")
-            return
+            mtime = os.stat(json_config_path).st_mtime
+            cached = _config_cache.get(json_config_path)
+            if cached is not None and cached[0] == mtime:
+                config = cached[1]
+                logger.debug("配置文件未变化，复用缓存的解析结果")
+            else:
+                # 解析放到执行器线程：update_config触发的重载不会
+                # 在事件循环线程上做阻塞的磁盘读+解析
+                config = await asyncio.get_running_loop().run_in_executor(
+                    None, _read_and_parse, json_config_path)
+                _config_cache[json_config_path] = (mtime, config)
+                logger.info("已从JSON文件加载配置")
         except Exception as e:
             logger.error(f"加载JSON配置失败: {str(e)}")
-    
-    # 如果两种配置都加载失败，使用默认配置并创建配置文件
+
+    # 兼容旧版YAML配置：迁移为JSON后备份原文件，之后不再走YAML路径
+    if config is None and os.path.exists(yaml_config_path):
+        try:
+            import yaml
+            with open(yaml_config_path, "r", encoding="utf-8") as f:
+                config = yaml.safe_load(f)
+            with open(json_config_path, "w", encoding="utf-8") as f:
+                f.write(_json_dumps_pretty(config))
+            os.replace(yaml_config_path, yaml_config_path + ".bak")
+            logger.info("已将旧版YAML配置迁移为JSON（原文件备份为config.yaml.bak）")
+        except Exception as e:
+            logger.error(f"迁移YAML配置失败: {str(e)}")
+
+    # 如果配置加载失败，使用默认配置并创建配置文件
     if config is None: # 检查config是否仍为None
         config = DEFAULT_CONFIG.copy()
         logger.info("使用默认配置")
-        # 尝试创建配置文件...
-        # 创建YAML配置文件
         try:
-            with open(yaml_config_path, "w", encoding="utf-8") as f:
-                yaml.dump(config, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
-            logger.info("已创建默认YAML配置文件")
+            with open(json_config_path, "w", encoding="utf-8") as f:
+                f.write(_json_dumps_pretty(config))
+            logger.info("已创建默认JSON配置文件")
         except Exception as e:
-            logger.error(f"创建YAML配置文件失败: {str(e)}")
-            # 尝试创建JSON配置
-            try:
-                with open(json_config_path, "w", encoding="utf-8") as f:
-                    json.dump(config, f, indent=4, ensure_ascii=False)
-                logger.info("已创建默认JSON配置文件")
-            except Exception as e:
-                logger.error(f"创建JSON配置文件失败: {str(e)}")
+            logger.error(f"创建JSON配置文件失败: {str(e)}")
     else:
         # 确保加载的配置包含必要的字段
         if "osc" not in config:
@@ -472,28 +676,25 @@ async def load_config() -> None:
     THROTTLE_INTERVAL = config.get("osc", {}).get("throttle_interval_ms", 100) / 1000.0
     THROTTLE_INTERVAL = max(0.05, THROTTLE_INTERVAL) # 限制最小间隔为50ms
 
+    # 重建热路径用的扁平化通道配置
+    _rebuild_channel_cfg()
+
+    # 通知等待方配置已就绪
+    if _config_ready is not None:
+        _config_ready.set()
+
 async def save_config() -> None:
-    """保存插件配置"""
+    """保存插件配置（只写JSON，见load_config）"""
     global config
-    
+
     # 配置文件路径
     base_dir = os.path.dirname(os.path.abspath(__file__))
     json_config_path = os.path.join(base_dir, "config.json")
-    yaml_config_path = os.path.join(base_dir, "config.yaml")
-    
-    # 首先尝试保存为YAML
-    try:
-        with open(yaml_config_path, "w", encoding="utf-8") as f:
-            yaml.dump(config, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
-        logger.info("已保存配置到YAML文件")
-        return
-    except Exception as e:
-        logger.error(f"保存YAML配置失败: {str(e)}")
-    
-    # 如果YAML保存失败，尝试保存为JSON
+
     try:
-        with open(json_config_path, "w", encoding="utf-8") as f:
-            json.dump(config, f, indent=4, ensure_ascii=False)
+        # 序列化在循环线程完成（很快），磁盘写入交给执行器线程
+        await asyncio.get_running_loop().run_in_executor(
+            None, _write_config_file, json_config_path, _json_dumps_pretty(config))
         logger.info("已保存配置到JSON文件")
     except Exception as e:
         logger.error(f"保存JSON配置失败: {str(e)}")
@@ -505,42 +706,58 @@ def setup():
     try:
         # 确保 running 标志为 True
         running = True
-        
-        # 创建任务链设置，确保顺序执行
-        def config_loaded_callback(future):
-            try:
-                # 配置加载完成，可以继续初始化其他部分
-                logger.info("配置加载完成，开始初始化OSC服务器和节流任务")
-                
-                # 创建服务器启动任务
-                global server_task, strength_sender_task
-                server_task = asyncio.ensure_future(start_osc_server())
-                logger.info("OSC服务器任务已启动")
-                
-                # 创建强度节流发送任务
-                strength_sender_task = asyncio.ensure_future(_throttled_strength_sender())
-                logger.info("强度节流任务已启动")
-                
-                # 如果设备已连接，初始化波形
-                if device and device.is_connected:
-                    logger.info("设备已连接，初始化波形...")
-                    asyncio.ensure_future(init_device_wave())
-                else:
-                    logger.warning("设备未连接，将在设备连接后初始化波形")
-            except Exception as e:
-                logger.error(f"初始化服务任务失败: {e}")
-        
-        # 先加载配置（异步），并设置回调
+
+        # 创建协调事件（需在运行中的事件循环内创建）
+        global _strength_dirty, _config_ready, _stop_event
+        _strength_dirty = asyncio.Event()
+        _config_ready = asyncio.Event()
+        _stop_event = asyncio.Event()
+
+        # Python 3.12+：启用eager task factory，OSC处理这类短协程
+        # 可以内联执行到第一个真正的await（如归一化值为0提前返回时
+        # 整个任务同步完成），省去一次调度器往返
+        if hasattr(asyncio, "eager_task_factory"):
+            loop = asyncio.get_event_loop()
+            if loop.get_task_factory() is None:
+                loop.set_task_factory(asyncio.eager_task_factory)
+                logger.info("已启用eager task factory")
+
+        # 启动引导协程：配置加载完成后顺序启动各任务，
+        # 不再通过add_done_callback间接串联
         logger.info("开始加载配置...")
-        config_future = asyncio.ensure_future(load_config())
-        config_future.add_done_callback(config_loaded_callback)
-        
+        asyncio.ensure_future(_bootstrap())
+
         logger.info("VRChat OSC插件已加载，等待配置和初始化完成")
-        
+
     except Exception as e:
         logger.error(f"VRChat OSC插件加载失败: {e}")
         raise
 
+async def _bootstrap() -> None:
+    """加载配置并按顺序启动OSC服务器、节流任务和波形初始化"""
+    global server_task, strength_sender_task
+
+    try:
+        await load_config()
+        logger.info("配置加载完成，开始初始化OSC服务器和节流任务")
+
+        # 创建服务器启动任务
+        server_task = asyncio.ensure_future(start_osc_server())
+        logger.info("OSC服务器任务已启动")
+
+        # 创建强度节流发送任务
+        strength_sender_task = asyncio.ensure_future(_throttled_strength_sender())
+        logger.info("强度节流任务已启动")
+
+        # 如果设备已连接，初始化波形
+        if device and device.is_connected:
+            logger.info("设备已连接，初始化波形...")
+            asyncio.ensure_future(init_device_wave())
+        else:
+            logger.warning("设备未连接，将在设备连接后初始化波形")
+    except Exception as e:
+        logger.error(f"初始化服务任务失败: {e}")
+
 async def init_device_wave():
     """初始化设备波形设置"""
     global config
@@ -552,8 +769,11 @@ async def init_device_wave():
     # 确保配置已加载
     if config is None:
         logger.warning("配置尚未加载，等待配置加载完成...")
-        while config is None:
-            await asyncio.sleep(0.1)
+        if _config_ready is not None:
+            await _config_ready.wait()
+        else:
+            while config is None:
+                await asyncio.sleep(0.1)
         logger.info("配置已加载，继续初始化波形")
     
     try:
@@ -568,8 +788,8 @@ async def init_device_wave():
         # 更新缓存
         wave_cache["A"] = channel_a_preset
         wave_cache["B"] = channel_b_preset
-        wave_cache["A_last_change"] = time.time()
-        wave_cache["B_last_change"] = time.time()
+        wave_cache["A_last_change"] = time.monotonic()
+        wave_cache["B_last_change"] = time.monotonic()
         
         logger.info(f"已初始化设备波形预设 (A: {channel_a_preset}, B: {channel_b_preset})")
     except Exception as e:
@@ -582,7 +802,9 @@ def cleanup():
     try:
         # 停止OSC服务器和节流任务
         running = False
-        
+        if _stop_event is not None:
+            _stop_event.set()
+
         # 取消强度节流任务
         if strength_sender_task and not strength_sender_task.done():
             strength_sender_task.cancel()
@@ -606,125 +828,141 @@ def cleanup():
     except Exception as e:
         logger.error(f"VRChat OSC插件卸载失败: {e}")
 
+async def _do_update_config(websocket, message_data) -> bool:
+    """处理配置更新"""
+    global config, server_task, running
+
+    new_config = message_data.get("config", {})
+    if not new_config:
+        return False
+
+    # 更新配置
+    config.update(new_config)
+    _rebuild_channel_cfg()
+
+    # 保存配置
+    await save_config()
+
+    # 重启OSC服务器以应用新配置
+    if running and server_task:
+        running = False
+        if _stop_event is not None:
+            _stop_event.set()
+        server_task.cancel()
+        server_task = None
+        server_task = asyncio.ensure_future(start_osc_server())
+
+    # 发送成功响应
+    await websocket.send(_dumps({
+        "type": "plugin_vrchat_osc_response",
+        "action": "update_config",
+        "success": True,
+        "message": "配置已更新"
+    }))
+
+    return True
+
+async def _do_get_config(websocket, message_data) -> bool:
+    """处理获取配置请求"""
+    await websocket.send(_dumps({
+        "type": "plugin_vrchat_osc_response",
+        "action": "get_config",
+        "config": config
+    }))
+
+    return True
+
+async def _do_set_wave_preset(websocket, message_data) -> bool:
+    """处理设置波形预设请求"""
+    preset_name = message_data.get("preset", "Pulse")
+    channel = message_data.get("channel", "both")
+
+    success = False
+    message = ""
+
+    if not device or not device.is_connected:
+        message = "设备未连接，无法设置波形"
+    else:
+        try:
+            if channel == "both" or channel == "A":
+                await device.set_wave_preset(preset_name, channel="A")
+
+            if channel == "both" or channel == "B":
+                await device.set_wave_preset(preset_name, channel="B")
+
+            success = True
+            message = f"已设置通道{channel}波形预设为{preset_name}"
+            logger.info(message)
+        except Exception as e:
+            message = f"设置波形预设失败: {str(e)}"
+            logger.error(message)
+
+    # 发送响应
+    await websocket.send(_dumps({
+        "type": "plugin_vrchat_osc_response",
+        "action": "set_wave_preset",
+        "success": success,
+        "message": message
+    }))
+
+    return True
+
+async def _do_get_wave_presets(websocket, message_data) -> bool:
+    """处理获取所有可用波形预设的请求"""
+    if device and device.is_connected:
+        try:
+            # 获取所有可用的波形预设
+            preset_names = device.get_wave_preset_names()
+
+            # 发送响应
+            await websocket.send(_dumps({
+                "type": "plugin_vrchat_osc_response",
+                "action": "get_wave_presets",
+                "presets": preset_names
+            }))
+        except Exception as e:
+            await websocket.send(_dumps({
+                "type": "plugin_vrchat_osc_response",
+                "action": "get_wave_presets",
+                "error": str(e)
+            }))
+    else:
+        await websocket.send(_dumps({
+            "type": "plugin_vrchat_osc_response",
+            "action": "get_wave_presets",
+            "error": "设备未连接"
+        }))
+
+    return True
+
+# action到处理函数的分发表：一次哈希查找替代逐个elif比较
+_ACTIONS: Dict[str, Callable] = {
+    "update_config": _do_update_config,
+    "get_config": _do_get_config,
+    "set_wave_preset": _do_set_wave_preset,
+    "get_wave_presets": _do_get_wave_presets,
+}
+
 async def handle_message(websocket, message_data):
     """
     处理WebSocket消息
-    
+
     Args:
         websocket: WebSocket连接
         message_data: 消息数据
-        
+
     Returns:
         bool: 消息是否被处理
     """
-    # 声明全局变量
-    global config, server_task, running
-    
     # 检查是否是针对本插件的消息
-    if message_data.get("type") == "plugin_vrchat_osc":
-        # 处理配置更新
-        if message_data.get("action") == "update_config":
-            new_config = message_data.get("config", {})
-            if new_config:
-                # 更新配置
-                config.update(new_config)
-                
-                # 保存配置
-                await save_config()
-                
-                # 重启OSC服务器以应用新配置
-                if running and server_task:
-                    running = False
-                    server_task.cancel()
-                    server_task = None
-                    server_task = asyncio.ensure_future(start_osc_server())
-                
-                # 发送成功响应
-                await websocket.send(json.dumps({
-                    "type": "plugin_vrchat_osc_response",
-                    "action": "update_config",
-                    "success": True,
-                    "message": "配置已更新"
-                }))
-                
-                return True
-        
-        # 处理获取配置请求
-        elif message_data.get("action") == "get_config":
-            # 发送当前配置
-            await websocket.send(json.dumps({
-                "type": "plugin_vrchat_osc_response",
-                "action": "get_config",
-                "config": config
-            }))
-            
-            return True
-            
-        # 处理设置波形预设请求
-        elif message_data.get("action") == "set_wave_preset":
-            preset_name = message_data.get("preset", "Pulse")
-            channel = message_data.get("channel", "both")
-            
-            success = False
-            message = ""
-            
-            if not device or not device.is_connected:
-                message = "设备未连接，无法设置波形"
-            else:
-                try:
-                    if channel == "both" or channel == "A":
-                        await device.set_wave_preset(preset_name, channel="A")
-                    
-                    if channel == "both" or channel == "B":
-                        await device.set_wave_preset(preset_name, channel="B")
-                    
-                    success = True
-                    message = f"已设置通道{channel}波形预设为{preset_name}"
-                    logger.info(message)
-                except Exception as e:
-                    message = f"设置波形预设失败: {str(e)}"
-                    logger.error(message)
-            
-            # 发送响应
-            await websocket.send(json.dumps({
-                "type": "plugin_vrchat_osc_response",
-                "action": "set_wave_preset",
-                "success": success,
-                "message": message
-            }))
-            
-            return True
-        
-        # 添加获取所有可用波形预设的处理
-        elif message_data.get("action") == "get_wave_presets":
-            if device and device.is_connected:
-                try:
-                    # 获取所有可用的波形预设
-                    preset_names = device.get_wave_preset_names()
-                    
-                    # 发送响应
-                    await websocket.send(json.dumps({
-                        "type": "plugin_vrchat_osc_response",
-                        "action": "get_wave_presets",
-                        "presets": preset_names
-                    }))
-                except Exception as e:
-                    await websocket.send(json.dumps({
-                        "type": "plugin_vrchat_osc_response",
-                        "action": "get_wave_presets",
-                        "error": str(e)
-                    }))
-            else:
-                await websocket.send(json.dumps({
-                    "type": "plugin_vrchat_osc_response",
-                    "action": "get_wave_presets",
-                    "error": "设备未连接"
-                }))
-            
-            return True
-    
-    # 消息未被处理
-    return False
+    if message_data.get("type") != "plugin_vrchat_osc":
+        return False
+
+    handler = _ACTIONS.get(message_data.get("action"))
+    if handler is None:
+        return False
+
+    return await handler(websocket, message_data)
 
 # 设置ws_server和device引用的函数
 def set_ws_server(server):
@@ -732,11 +970,12 @@ def set_ws_server(server):
     global ws_server, device
     ws_server = server
     
-    # 获取设备引用
-    if hasattr(server, 'device'):
+    # 获取设备引用（getattr单次查找，避免hasattr+属性访问两次遍历MRO）
+    new_device = getattr(server, 'device', None)
+    if new_device is not None:
         # 检查设备实例是否改变或首次设置
-        new_device_instance = server.device is not device
-        device = server.device
+        new_device_instance = new_device is not device
+        device = new_device
         # 设备就绪后初始化波形 (仅在首次设置或设备实例改变时)
         if device and device.is_connected and new_device_instance:
             logger.info("检测到设备实例或首次设置，初始化波形...")
@@ -744,6 +983,8 @@ def set_ws_server(server):
         # 重置上次发送强度，以便在新设备上强制发送初始强度
         global last_sent_strength
         last_sent_strength = {"A": -1, "B": -1}
+        if _strength_dirty is not None:
+            _strength_dirty.set()
 
 async def ensure_device_wave(channel: str, preset_name: str = None) -> None:
     """
@@ -760,27 +1001,30 @@ async def ensure_device_wave(channel: str, preset_name: str = None) -> None:
         return
     
     try:
+        keys = _PER_CHANNEL[channel]
+
         # 如果未指定预设名称，使用配置中设置的默认值
         if preset_name is None:
-            channel_key = "default_channel_a" if channel == "A" else "default_channel_b"
-            preset_name = config.get("wave_presets", {}).get(channel_key, "Pulse")
-        
-        # 检查波形是否已经设置以及上次更新时间
-        current_time = time.time()
-        last_change_key = f"{channel}_last_change"
-        
-        # 如果波形相同且更新间隔不足，则不重复设置
-        if (wave_cache[channel] == preset_name and 
-            current_time - wave_cache[last_change_key] < WAVE_UPDATE_INTERVAL):
+            preset_name = config.get("wave_presets", {}).get(keys.default_preset_key, "Pulse")
+
+        # 波形未变化直接返回——先做廉价的相等比较，
+        # 不为每条OSC消息白付一次取时钟的开销
+        if wave_cache[channel] == preset_name:
             return
-        
+
+        # 波形需要切换时才取时钟做防抖（monotonic不受系统时间跳变影响）
+        current_time = time.monotonic()
+        last_change_key = keys.last_change_key
+        if current_time - wave_cache[last_change_key] < WAVE_UPDATE_INTERVAL:
+            return
+
         # 更新缓存
         wave_cache[channel] = preset_name
         wave_cache[last_change_key] = current_time
         
         # 设置波形预设
         await device.set_wave_preset(preset_name, channel=channel)
-        logger.debug(f"已设置通道{channel}波形预设为{preset_name}")
+        logger.debug("已设置通道%s波形预设为%s", channel, preset_name)
     except Exception as e:
         logger.error(f"设置波形预设失败: {str(e)}")
 
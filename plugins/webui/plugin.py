@@ -5,9 +5,10 @@ WebUI 插件
 
 import os
 import asyncio
+import gzip
 import logging
-import threading
 import json
+import re
 from aiohttp import web
 from pathlib import Path
 import importlib
@@ -17,9 +18,30 @@ import traceback
 # 设置日志
 logger = logging.getLogger(__name__)
 
+# 静态资源路径：构建一次，免得每次请求重新拼Path对象
+_STATIC_DIR = Path(__file__).parent / "static"
+_INDEX_PATH = _STATIC_DIR / "index.html"
+
+# 主机/端口占位符：一次正则扫描同时替换两者（见_render_index）
+_PLACEHOLDER_RE = re.compile(r"\{\{(WS_HOST|WS_PORT)\}\}")
+
+# JSON序列化优先使用orjson（C实现），未安装时回退到标准库
+try:
+    import orjson
+
+    def _json_dumps_bytes(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    def _json_dumps_bytes(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
 # 存储WebSocket服务器引用
 ws_server = None
 
+# set_ws_server时抓取的(host, port)快照：这两个值之后不变，
+# 请求处理读一个元组即可，不再逐次做属性查找
+_ws_info = ("", 0)
+
 # AB通道同步状态
 channel_sync_enabled = False
 
@@ -50,6 +72,9 @@ def register_ui_extension(extension_point, name, html, js=None):
             "html": html,
             "js": js
         })
+        # 注入内容变了，让缓存的渲染结果失效
+        if webui_instance is not None:
+            webui_instance.invalidate_index_cache()
         logger.info(f"已注册UI扩展: {name} 到 {extension_point}")
         return True
     return False
@@ -71,88 +96,137 @@ class WebUI:
         self.setup_routes()
         self.runner = None
         self.site = None
-        self.thread = None
-        self.running = False
+        self._start_task = None
+        # 渲染好的主页字节缓存：模板、占位符和扩展都只在失效后重新处理；
+        # 同时保留一份gzip压缩结果（压缩只在渲染时做一次）
+        self._index_cache = None
+        self._index_gz = None
+        # /api/config的序列化缓存：载荷只随设备连接状态变化
+        self._config_cache = None
+        self._config_connected = None
+
+    def invalidate_index_cache(self):
+        """使缓存的主页渲染结果失效（扩展注册/服务器引用变化时调用）"""
+        self._index_cache = None
+        self._index_gz = None
+
+    def invalidate_config_cache(self):
+        """使缓存的/api/config载荷失效（服务器引用变化时调用）"""
+        self._config_cache = None
     
     def setup_routes(self):
         """设置Web路由"""
-        # 静态文件目录
-        static_path = Path(__file__).parent / "static"
-        if not static_path.exists():
-            static_path.mkdir()
-        
+        # 静态文件目录（幂等创建，免去先stat再mkdir的两次系统调用）
+        _STATIC_DIR.mkdir(exist_ok=True)
+
         # 设置路由
         self.app.router.add_get("/", self.handle_index)
         self.app.router.add_get("/api/config", self.handle_config)
-        self.app.router.add_static("/static", static_path)
+        self.app.router.add_static("/static", _STATIC_DIR)
     
     async def handle_index(self, request):
-        """处理主页请求"""
-        html_path = Path(__file__).parent / "static" / "index.html"
-        
-        try:
-            with open(html_path, encoding="utf-8") as f:
-                content = f.read()
-            
-            # 替换占位符
-            content = content.replace("{{WS_HOST}}", ws_server.host)
-            content = content.replace("{{WS_PORT}}", str(ws_server.port))
-            
-            # 注入UI扩展 - 修复字符串替换逻辑
-            for point, extensions in ui_extensions.items():
-                logger.debug(f"扩展点 {point} 有 {len(extensions)} 个扩展")
-                for ext in extensions:
-                    logger.debug(f"处理扩展: {ext['name']} (HTML长度: {len(ext['html'])})")
-                
-                # 为每个扩展点生成HTML和JS
-                extension_html = ""
-                extension_js = ""
-                
-                for ext in extensions:
-                    logger.info(f"正在注入扩展: {ext['name']} 到 {point}")
-                    extension_html += f'<div class="ui-extension" data-name="{ext["name"]}">{ext["html"]}</div>\n'
-                    if ext.get("js"):
-                        extension_js += f"// {ext['name']} 扩展JS\n{ext['js']}\n"
-                
-                # 执行字符串替换 - 使用简单字符串格式
-                placeholder_html = "{{EXTENSIONS_" + point.upper() + "}}"
-                placeholder_js = "{{EXTENSIONS_JS_" + point.upper() + "}}"
-                
-                logger.debug(f"查找占位符: '{placeholder_html}'")
-                if placeholder_html in content:
-                    logger.debug(f"找到占位符 '{placeholder_html}'，进行替换")
-                    content = content.replace(placeholder_html, extension_html)
-                    content = content.replace(placeholder_js, extension_js)
-            
-            return web.Response(text=content, content_type="text/html")
-        except FileNotFoundError:
-            logger.error(f"HTML文件不存在: {html_path}")
-            return web.Response(text="HTML文件未找到，请确保index.html文件存在于static目录中", status=404)
-        except Exception as e:
-            logger.error(f"生成HTML时出错: {str(e)}")
-            return web.Response(text=f"生成页面时出错: {str(e)}", status=500)
+        """处理主页请求
+
+        ws_server和已注册扩展确定后渲染结果就是常量：首次请求渲染并
+        编码成bytes缓存在内存，之后的请求零磁盘读、零字符串替换
+        """
+        body = self._index_cache
+        if body is None:
+            html_path = _INDEX_PATH
+            try:
+                # 模板读取走执行器线程，冷路径的磁盘I/O不占事件循环；
+                # 直接run_in_executor，省掉asyncio.to_thread的
+                # copy_context+partial包装
+                content = await asyncio.get_running_loop().run_in_executor(
+                    None, html_path.read_text, "utf-8")
+                body = self._render_index(content)
+            except FileNotFoundError:
+                logger.error(f"HTML文件不存在: {html_path}")
+                return web.Response(text="HTML文件未找到，请确保index.html文件存在于static目录中", status=404)
+            except Exception as e:
+                logger.error(f"生成HTML时出错: {str(e)}")
+                return web.Response(text=f"生成页面时出错: {str(e)}", status=500)
+            self._index_cache = body
+            # 压缩只在渲染时做一次，之后支持gzip的客户端直接取压缩字节
+            self._index_gz = gzip.compress(body, compresslevel=9)
+
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            return web.Response(body=self._index_gz, content_type="text/html",
+                                charset="utf-8",
+                                headers={"Content-Encoding": "gzip",
+                                         "Vary": "Accept-Encoding"})
+
+        return web.Response(body=body, content_type="text/html", charset="utf-8")
+
+    def _render_index(self, content):
+        """对模板文本做占位符替换和扩展注入（仅在缓存失效后执行）"""
+        # 替换占位符——单次扫描替换两个占位符，不生成两份中间字符串
+        subs = {"WS_HOST": ws_server.host, "WS_PORT": str(ws_server.port)}
+        content = _PLACEHOLDER_RE.sub(lambda m: subs[m.group(1)], content)
+
+        # 注入UI扩展 - 修复字符串替换逻辑
+        for point, extensions in ui_extensions.items():
+            logger.debug(f"扩展点 {point} 有 {len(extensions)} 个扩展")
+            for ext in extensions:
+                logger.debug(f"处理扩展: {ext['name']} (HTML长度: {len(ext['html'])})")
+
+            # 为每个扩展点生成HTML和JS
+            extension_html = ""
+            extension_js = ""
+
+            for ext in extensions:
+                logger.info(f"正在注入扩展: {ext['name']} 到 {point}")
+                extension_html += f'<div class="ui-extension" data-name="{ext["name"]}">{ext["html"]}</div>\n'
+                if ext.get("js"):
+                    extension_js += f"// {ext['name']} 扩展JS\n{ext['js']}\n"
+
+            # 执行字符串替换 - 使用简单字符串格式
+            placeholder_html = "{{EXTENSIONS_" + point.upper() + "}}"
+            placeholder_js = "{{EXTENSIONS_JS_" + point.upper() + "}}"
+
+            logger.debug(f"查找占位符: '{placeholder_html}'")
+            if placeholder_html in content:
+                logger.debug(f"找到占位符 '{placeholder_html}'，进行替换")
+                content = content.replace(placeholder_html, extension_html)
+                content = content.replace(placeholder_js, extension_js)
+
+        return content.encode("utf-8")
     
     async def handle_config(self, request):
-        """处理配置API请求"""
-        config = {
-            "ws_host": ws_server.host,
-            "ws_port": ws_server.port,
-            "device_connected": ws_server.device is not None and ws_server.device.is_connected
-        }
-        return web.json_response(config)
+        """处理配置API请求
+
+        ws_host/ws_port固定，载荷只随设备连接状态变化：
+        缓存序列化好的bytes，连接状态翻转时才重建
+        """
+        device = ws_server.device if ws_server else None
+        connected = device is not None and device.is_connected
+
+        body = self._config_cache
+        if body is None or connected != self._config_connected:
+            host, port = _ws_info
+            body = _json_dumps_bytes({
+                "ws_host": host,
+                "ws_port": port,
+                "device_connected": connected
+            })
+            self._config_cache = body
+            self._config_connected = connected
+
+        return web.Response(body=body, content_type="application/json")
     
     async def start_server(self):
-        """启动Web服务器"""
+        """启动Web服务器（运行在主事件循环上）"""
         try:
-            self.runner = web.AppRunner(self.app)
+            # 关闭访问日志：/api/config被前端轮询，逐请求的
+            # 日志格式化和logging锁开销比处理器本身还大
+            self.runner = web.AppRunner(self.app, access_log=None)
             await self.runner.setup()
             self.site = web.TCPSite(self.runner, self.host, self.port)
             await self.site.start()
             logger.info(f"WebUI服务器已启动: http://{self.host}:{self.port}")
         except Exception as e:
             logger.error(f"启动WebUI服务器失败: {e}")
-            raise
-    
+
     async def stop_server(self):
         """停止Web服务器"""
         if self.runner:
@@ -160,51 +234,30 @@ class WebUI:
             self.runner = None
             self.site = None
             logger.info("WebUI服务器已停止")
-    
-    def run_in_thread(self):
-        """在线程中运行Web服务器"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            loop.run_until_complete(self.start_server())
-            self.running = True
-            loop.run_forever()
-        except Exception as e:
-            logger.error(f"WebUI服务器线程错误: {e}")
-        finally:
-            loop.run_until_complete(self.stop_server())
-            loop.close()
-            self.running = False
-    
+
     def start(self):
-        """启动WebUI服务"""
-        if self.running:
+        """启动WebUI服务
+
+        直接作为主事件循环上的任务启动：aiohttp处理器是纯I/O，
+        独立线程+第二个事件循环只会多付线程切换和关停复杂度
+        """
+        if self._start_task and not self._start_task.done():
             logger.warning("WebUI服务器已在运行")
             return
-        
-        self.thread = threading.Thread(target=self.run_in_thread)
-        self.thread.daemon = True
-        self.thread.start()
-    
+
+        self._start_task = asyncio.create_task(self.start_server())
+
     def stop(self):
-        """停止WebUI服务"""
-        if not self.running:
-            return
-        
-        # 获取线程的事件循环并调用停止
-        if self.thread and self.thread.is_alive():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(self.stop_server())
-            loop.close()
-            
-            # 等待线程结束
-            self.thread.join(timeout=2.0)
-            if self.thread.is_alive():
-                logger.warning("WebUI线程未能正常结束")
-            
-            self.thread = None
+        """停止WebUI服务（把清理协程调度回主事件循环）"""
+        if self._start_task and not self._start_task.done():
+            self._start_task.cancel()
+        self._start_task = None
+
+        if self.runner:
+            try:
+                asyncio.get_running_loop().create_task(self.stop_server())
+            except RuntimeError:
+                logger.warning("没有运行中的事件循环，WebUI服务器未能清理")
 
 # 全局WebUI实例
 webui_instance = None
@@ -214,11 +267,7 @@ def setup():
     global webui_instance
     
     try:
-        # 创建静态目录
-        static_path = Path(__file__).parent / "static"
-        if not static_path.exists():
-            static_path.mkdir()
-        
+        # 静态目录由WebUI.setup_routes幂等创建
         # 创建并启动WebUI
         webui_instance = WebUI()
         webui_instance.start()
@@ -336,21 +385,16 @@ async def handle_message(websocket, message_data):
     # 其他类型的消息由默认处理器处理
     return False
 
-def create_static_files():
-    """创建静态文件目录"""
-    # 创建静态文件目录
-    static_path = Path(__file__).parent / "static"
-    if not static_path.exists():
-        static_path.mkdir()
-        logger.info("已创建静态文件目录")
-    else:
-        logger.info("静态文件目录已存在")
-
 # 设置插件钩子，允许加载时注入WebSocket服务器引用
 def set_ws_server(server):
     """设置WebSocket服务器引用"""
-    global ws_server
+    global ws_server, _ws_info
     ws_server = server
+    _ws_info = (server.host, server.port)
+    # 占位符和配置载荷的值可能变化，让缓存失效
+    if webui_instance is not None:
+        webui_instance.invalidate_index_cache()
+        webui_instance.invalidate_config_cache()
     logger.info("WebUI已接收WebSocket服务器引用")
     
     # 如果启用了通道同步，广播状态
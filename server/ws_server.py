@@ -14,6 +14,16 @@ from websockets.server import WebSocketServerProtocol
 from core.dglab_device import DGLabDevice
 from core.models import WaveSet
 
+# 可选的orjson加速：编解码比标准库json快数倍，未安装时回退到标准库
+try:
+    import orjson
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+except ImportError:
+    def _json_dumps(obj: Any) -> str:
+        return json.dumps(obj)
+
 # 设置日志
 logger = logging.getLogger(__name__)
 
@@ -40,6 +50,9 @@ class DGLabWebSocketServer:
         self.device = device
         self.server = None
         self.clients: Dict[str, WebSocketServerProtocol] = {}
+        # 每客户端独立的发送队列：广播只做入队，由各自的写入协程
+        # 实际发送，慢客户端不会阻塞其他客户端
+        self.client_queues: Dict[str, asyncio.Queue] = {}
         self.plugins: Dict[str, Callable] = {}
         self.running = False
         self._update_task = None
@@ -61,10 +74,13 @@ class DGLabWebSocketServer:
                 raise RuntimeError(f"无法启动服务器，未找到设备: {e}")
         
         # 启动服务器
+        # 禁用permessage-deflate：广播载荷很小，逐客户端压缩的CPU开销
+        # 远大于节省的字节数，关闭后每条消息只需编码一次、发送N次
         self.server = await websockets.serve(
             self._handle_client,
             self.host,
-            self.port
+            self.port,
+            compression=None
         )
         
         self.running = True
@@ -124,7 +140,12 @@ class DGLabWebSocketServer:
         # 添加到客户端列表
         self.clients[client_id] = websocket
         logger.info(f"客户端 {client_id} 已连接，当前客户端数量: {len(self.clients)}")
-        
+
+        # 为客户端创建发送队列和专属写入协程
+        queue: asyncio.Queue = asyncio.Queue(maxsize=256)
+        self.client_queues[client_id] = queue
+        writer_task = asyncio.create_task(self._client_writer(client_id, websocket, queue))
+
         try:
             # 发送初始状态
             await self._send_state(websocket)
@@ -154,9 +175,52 @@ class DGLabWebSocketServer:
             logger.error(f"处理客户端连接错误: {e}")
         finally:
             # 清理客户端
+            writer_task.cancel()
             if client_id in self.clients:
                 del self.clients[client_id]
+            if client_id in self.client_queues:
+                del self.client_queues[client_id]
             logger.info(f"客户端 {client_id} 已断开连接，当前客户端数量: {len(self.clients)}")
+
+    async def _client_writer(
+        self,
+        client_id: str,
+        websocket: WebSocketServerProtocol,
+        queue: asyncio.Queue
+    ) -> None:
+        """
+        客户端写入协程：从该客户端的发送队列取消息并发送
+
+        Args:
+            client_id: 客户端ID
+            websocket: WebSocket连接
+            queue: 该客户端的发送队列
+        """
+        try:
+            while True:
+                message = await queue.get()
+                await websocket.send(message)
+        except asyncio.CancelledError:
+            pass
+        except websockets.exceptions.ConnectionClosed:
+            logger.debug(f"客户端 {client_id} 连接已关闭，写入协程退出")
+        except Exception as e:
+            logger.error(f"客户端 {client_id} 写入协程出错: {e}")
+
+    def _enqueue_broadcast(self, message: str) -> None:
+        """
+        把消息放入所有客户端的发送队列
+
+        队列已满说明客户端消费过慢，丢弃该客户端的这条消息而不是阻塞广播方
+
+        Args:
+            message: 已序列化的消息
+        """
+        for client_id, queue in list(self.client_queues.items()):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                logger.warning(f"客户端 {client_id} 发送队列已满，丢弃广播消息")
     
     async def _handle_message(self, websocket: WebSocketServerProtocol, data: Dict[str, Any]) -> None:
         """
@@ -376,14 +440,11 @@ class DGLabWebSocketServer:
             device_state = await self.device.get_state()
             state["data"].update(device_state)
         
-        message = json.dumps(state)
-        
-        # 广播到所有客户端
-        for websocket in self.clients.values():
-            try:
-                await websocket.send(message)
-            except Exception as e:
-                logger.error(f"向客户端广播状态失败: {e}")
+        # 状态只序列化一次，随后按客户端数量复用同一字符串
+        message = _json_dumps(state)
+
+        # 广播到所有客户端（入队即可，发送由各客户端的写入协程完成）
+        self._enqueue_broadcast(message)
     
     async def _update_clients_loop(self) -> None:
         """客户端状态更新循环"""
@@ -429,16 +490,8 @@ class DGLabWebSocketServer:
         """
         if not self.clients:
             return
-            
-        message_json = json.dumps(message)
-        
-        # 创建异步任务发送消息
-        async def send_to_all():
-            for client_id, client in list(self.clients.items()):
-                try:
-                    await client.send(message_json)
-                except Exception as e:
-                    logger.error(f"向客户端 {client_id} 广播消息失败: {e}")
-        
-        # 在事件循环中执行发送任务
-        asyncio.create_task(send_to_all()) 
\ No newline at end of file
+
+        message_json = _json_dumps(message)
+
+        # 入队即可，发送由各客户端的写入协程完成
+        self._enqueue_broadcast(message_json) 
\ No newline at end of file